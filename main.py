@@ -12,14 +12,19 @@ from services.categorias_service import ServicioCategorias
 from services.persistencia_service import ServicioPersistencia
 from services.graph_service import GraphService
 from getpass import getpass
+import logging
+
+# Mostrar en consola los mensajes de los servicios (migraciones, errores de
+# guardado) tal como antes se imprimían; debe configurarse antes de crearlos
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 # Initialize services
-users_service = UsersService()
-books_service = BooksService()
-graph_service = GraphService()
-movements_service = MovementsService(books_service, graph_service)
-categorias_service = ServicioCategorias(books_service)
 persistencia_service = ServicioPersistencia()
+users_service = UsersService(persistencia_service)
+books_service = BooksService(persistencia_service)
+graph_service = GraphService()
+movements_service = MovementsService(books_service, graph_service, persistencia_service)
+categorias_service = ServicioCategorias(books_service, persistencia_service)
 
 # Inicializar libros con categorías de ejemplo
 def inicializar_categorias_ejemplo():
@@ -703,6 +708,8 @@ def menu_recomendaciones():
     """
     Menú específico para el sistema de recomendación basado en grafos.
     """
+    # El grafo recibe los préstamos activos al cargar los movimientos
+    movements_service.cargar()
     while True:
         print("\n" + "=" * 50)
         print("🔮 SISTEMA DE RECOMENDACIÓN DE LIBROS 🔮")
@@ -16,6 +16,11 @@ class Book():
         updated_at (date): Fecha de última actualización del registro.
     """
     
+    __slots__ = (
+        'id', 'title', 'author', 'published_date', 'isbn', 'quantity',
+        'created_at', 'updated_at',
+    )
+    
     def __init__(self, id, title, author, published_date, isbn, quantity, created_at, updated_at):
         """
         Inicializa una nueva instancia de Book.
@@ -10,9 +10,16 @@ class NodoCategoria:
         descripcion (str): Descripción detallada de la categoría.
         hijos (list[NodoCategoria]): Lista de subcategorías hijas.
         padre (NodoCategoria): Referencia al nodo padre (None para raíz).
-        libros (list[int]): Lista de IDs de libros pertenecientes a esta categoría.
+        libros (set[int]): Conjunto de IDs de libros pertenecientes a esta categoría.
     """
     
+    # Sin __dict__ por instancia: en taxonomías grandes reduce la memoria
+    # de cada nodo y el acceso a atributos se resuelve por slot
+    __slots__ = (
+        'nombre', 'descripcion', 'hijos', 'padre', 'libros',
+        '_total_libros', '_todos_los_libros',
+    )
+    
     def __init__(self, nombre, descripcion=""):
         """
         Inicializa un nuevo nodo de categoría.
@@ -25,7 +32,22 @@ class NodoCategoria:
         self.descripcion = descripcion
         self.hijos = []
         self.padre = None
-        self.libros = []
+        self.libros = set()
+        
+        # Resultados memorizados de la rama; se invalidan hacia la raíz
+        # cada vez que cambian los libros o los hijos de un nodo
+        self._total_libros = None
+        self._todos_los_libros = None
+    
+    def _invalidar_cache(self):
+        """
+        Descarta los totales memorizados de este nodo y de sus ancestros.
+        """
+        nodo = self
+        while nodo is not None:
+            nodo._total_libros = None
+            nodo._todos_los_libros = None
+            nodo = nodo.padre
     
     def agregar_hijo(self, nodo_hijo):
         """
@@ -36,16 +58,34 @@ class NodoCategoria:
         """
         nodo_hijo.padre = self
         self.hijos.append(nodo_hijo)
+        self._invalidar_cache()
+    
+    def agregar_hijos(self, nodos_hijos):
+        """
+        Agrega varias subcategorías como hijas de este nodo.
+        
+        Equivale a llamar a agregar_hijo por cada nodo, pero extiende la
+        lista de hijos de una sola vez e invalida los totales una sola vez.
+        
+        Args:
+            nodos_hijos (iterable[NodoCategoria]): Los nodos hijos a agregar.
+        """
+        nodos_hijos = list(nodos_hijos)
+        for nodo_hijo in nodos_hijos:
+            nodo_hijo.padre = self
+        self.hijos.extend(nodos_hijos)
+        self._invalidar_cache()
     
     def agregar_libro(self, id_libro):
         """
-        Agrega un libro a esta categoría.
+        Agrega un libro a esta categoría. Agregar un libro ya presente no tiene efecto.
         
         Args:
             id_libro (int): ID del libro a agregar.
         """
         if id_libro not in self.libros:
-            self.libros.append(id_libro)
+            self.libros.add(id_libro)
+            self._invalidar_cache()
     
     def remover_libro(self, id_libro):
         """
@@ -58,10 +98,21 @@ class NodoCategoria:
             bool: True si el libro fue removido, False si no se encontró.
         """
         if id_libro in self.libros:
-            self.libros.remove(id_libro)
+            self.libros.discard(id_libro)
+            self._invalidar_cache()
             return True
         return False
     
+    def establecer_libros(self, ids_libros):
+        """
+        Reemplaza los libros de esta categoría.
+        
+        Args:
+            ids_libros (iterable[int]): IDs de los libros de la categoría.
+        """
+        self.libros = set(ids_libros)
+        self._invalidar_cache()
+    
     def obtener_todos_los_libros(self):
         """
         Obtiene todos los libros de esta categoría y sus subcategorías.
@@ -69,10 +120,12 @@ class NodoCategoria:
         Returns:
             list[int]: Lista de IDs de todos los libros en esta rama del árbol.
         """
-        todos_los_libros = self.libros.copy()
-        for hijo in self.hijos:
-            todos_los_libros.extend(hijo.obtener_todos_los_libros())
-        return todos_los_libros
+        if self._todos_los_libros is None:
+            todos_los_libros = list(self.libros)
+            for hijo in self.hijos:
+                todos_los_libros.extend(hijo.obtener_todos_los_libros())
+            self._todos_los_libros = todos_los_libros
+        return self._todos_los_libros.copy()
     
     def buscar_categoria(self, nombre):
         """
@@ -101,9 +154,14 @@ class NodoCategoria:
         Returns:
             list[str]: Lista de nombres de categorías formando la ruta.
         """
-        if self.padre is None:
-            return [self.nombre]
-        return self.padre.obtener_ruta() + [self.nombre]
+        # Subir hasta la raíz acumulando nombres en una sola lista
+        ruta = []
+        nodo = self
+        while nodo is not None:
+            ruta.append(nodo.nombre)
+            nodo = nodo.padre
+        ruta.reverse()
+        return ruta
     
     def contar_libros_directos(self):
         """
@@ -121,7 +179,11 @@ class NodoCategoria:
         Returns:
             int: Número total de libros en esta rama.
         """
-        return len(self.obtener_todos_los_libros())
+        if self._total_libros is None:
+            self._total_libros = len(self.libros) + sum(
+                hijo.contar_libros_totales() for hijo in self.hijos
+            )
+        return self._total_libros
 
 
 class ArbolCategorias:
@@ -151,57 +213,67 @@ class ArbolCategorias:
         self.raiz.agregar_hijo(ficcion)
         
         # Subcategorías de Ficción
-        ficcion.agregar_hijo(NodoCategoria("Novela", "Novelas largas de ficción"))
-        ficcion.agregar_hijo(NodoCategoria("Cuento", "Relatos cortos y cuentos"))
-        ficcion.agregar_hijo(NodoCategoria("Ciencia Ficción", "Literatura de ciencia ficción y futurismo"))
-        ficcion.agregar_hijo(NodoCategoria("Fantasía", "Literatura fantástica y mundos imaginarios"))
-        ficcion.agregar_hijo(NodoCategoria("Misterio", "Novelas de misterio y suspenso"))
-        ficcion.agregar_hijo(NodoCategoria("Romance", "Literatura romántica"))
-        ficcion.agregar_hijo(NodoCategoria("Terror", "Literatura de terror y horror"))
+        ficcion.agregar_hijos([
+            NodoCategoria("Novela", "Novelas largas de ficción"),
+            NodoCategoria("Cuento", "Relatos cortos y cuentos"),
+            NodoCategoria("Ciencia Ficción", "Literatura de ciencia ficción y futurismo"),
+            NodoCategoria("Fantasía", "Literatura fantástica y mundos imaginarios"),
+            NodoCategoria("Misterio", "Novelas de misterio y suspenso"),
+            NodoCategoria("Romance", "Literatura romántica"),
+            NodoCategoria("Terror", "Literatura de terror y horror"),
+        ])
         
         # Categoría: No Ficción
         no_ficcion = NodoCategoria("No Ficción", "Obras basadas en hechos reales y conocimiento")
         self.raiz.agregar_hijo(no_ficcion)
         
         # Subcategorías de No Ficción
-        no_ficcion.agregar_hijo(NodoCategoria("Historia", "Libros de historia y acontecimientos pasados"))
-        no_ficcion.agregar_hijo(NodoCategoria("Biografía", "Biografías y autobiografías"))
-        no_ficcion.agregar_hijo(NodoCategoria("Ciencia", "Divulgación científica y textos académicos"))
-        no_ficcion.agregar_hijo(NodoCategoria("Tecnología", "Libros sobre tecnología e innovación"))
-        no_ficcion.agregar_hijo(NodoCategoria("Filosofía", "Obras filosóficas y pensamiento"))
-        no_ficcion.agregar_hijo(NodoCategoria("Arte", "Libros sobre arte y cultura"))
-        no_ficcion.agregar_hijo(NodoCategoria("Deportes", "Literatura deportiva y actividad física"))
+        no_ficcion.agregar_hijos([
+            NodoCategoria("Historia", "Libros de historia y acontecimientos pasados"),
+            NodoCategoria("Biografía", "Biografías y autobiografías"),
+            NodoCategoria("Ciencia", "Divulgación científica y textos académicos"),
+            NodoCategoria("Tecnología", "Libros sobre tecnología e innovación"),
+            NodoCategoria("Filosofía", "Obras filosóficas y pensamiento"),
+            NodoCategoria("Arte", "Libros sobre arte y cultura"),
+            NodoCategoria("Deportes", "Literatura deportiva y actividad física"),
+        ])
         
         # Categoría: Educación
         educacion = NodoCategoria("Educación", "Material educativo y académico")
         self.raiz.agregar_hijo(educacion)
         
         # Subcategorías de Educación
-        educacion.agregar_hijo(NodoCategoria("Matemáticas", "Libros de matemáticas y álgebra"))
-        educacion.agregar_hijo(NodoCategoria("Lengua", "Gramática, literatura y lingüística"))
-        educacion.agregar_hijo(NodoCategoria("Ciencias Naturales", "Biología, química, física"))
-        educacion.agregar_hijo(NodoCategoria("Ciencias Sociales", "Sociología, antropología, política"))
-        educacion.agregar_hijo(NodoCategoria("Idiomas", "Aprendizaje de idiomas extranjeros"))
+        educacion.agregar_hijos([
+            NodoCategoria("Matemáticas", "Libros de matemáticas y álgebra"),
+            NodoCategoria("Lengua", "Gramática, literatura y lingüística"),
+            NodoCategoria("Ciencias Naturales", "Biología, química, física"),
+            NodoCategoria("Ciencias Sociales", "Sociología, antropología, política"),
+            NodoCategoria("Idiomas", "Aprendizaje de idiomas extranjeros"),
+        ])
         
         # Categoría: Referencia
         referencia = NodoCategoria("Referencia", "Material de consulta y referencia")
         self.raiz.agregar_hijo(referencia)
         
         # Subcategorías de Referencia
-        referencia.agregar_hijo(NodoCategoria("Diccionarios", "Diccionarios monolingües y bilingües"))
-        referencia.agregar_hijo(NodoCategoria("Enciclopedias", "Enciclopedias generales y especializadas"))
-        referencia.agregar_hijo(NodoCategoria("Atlas", "Atlas geográficos y mapas"))
-        referencia.agregar_hijo(NodoCategoria("Manuales", "Manuales técnicos y guías"))
+        referencia.agregar_hijos([
+            NodoCategoria("Diccionarios", "Diccionarios monolingües y bilingües"),
+            NodoCategoria("Enciclopedias", "Enciclopedias generales y especializadas"),
+            NodoCategoria("Atlas", "Atlas geográficos y mapas"),
+            NodoCategoria("Manuales", "Manuales técnicos y guías"),
+        ])
         
         # Categoría: Literatura Infantil
         infantil = NodoCategoria("Literatura Infantil", "Libros para niños y jóvenes")
         self.raiz.agregar_hijo(infantil)
         
         # Subcategorías de Literatura Infantil
-        infantil.agregar_hijo(NodoCategoria("Cuentos Infantiles", "Cuentos para niños pequeños"))
-        infantil.agregar_hijo(NodoCategoria("Literatura Juvenil", "Libros para adolescentes"))
-        infantil.agregar_hijo(NodoCategoria("Libros Ilustrados", "Libros con ilustraciones"))
-        infantil.agregar_hijo(NodoCategoria("Educativos Infantiles", "Material educativo para niños"))
+        infantil.agregar_hijos([
+            NodoCategoria("Cuentos Infantiles", "Cuentos para niños pequeños"),
+            NodoCategoria("Literatura Juvenil", "Libros para adolescentes"),
+            NodoCategoria("Libros Ilustrados", "Libros con ilustraciones"),
+            NodoCategoria("Educativos Infantiles", "Material educativo para niños"),
+        ])
     
     def agregar_categoria(self, nombre_padre, nombre_categoria, descripcion=""):
         """
@@ -271,7 +343,7 @@ class ArbolCategorias:
             if incluir_subcategorias:
                 return categoria.obtener_todos_los_libros()
             else:
-                return categoria.libros.copy()
+                return list(categoria.libros)
         return []
     
     def buscar_categoria_de_libro(self, id_libro):
@@ -373,7 +445,7 @@ class ArbolCategorias:
                 resultado += f" ({total_libros} libros)"
         
         if mostrar_libros and directos_libros > 0:
-            resultado += f" - IDs: {nodo.libros}"
+            resultado += f" - IDs: {sorted(nodo.libros)}"
         
         resultado += "\n"
         
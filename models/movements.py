@@ -17,6 +17,11 @@ class Movement():
         updated_at (date): Fecha de última actualización del registro.
     """
     
+    __slots__ = (
+        'id', 'book_id', 'student_name', 'student_identification', 'loan_date',
+        'return_date', 'returned', 'created_at', 'updated_at',
+    )
+    
     def __init__(self, id, book_id, student_name, student_identification, loan_date, return_date, returned, created_at, updated_at):
         """
         Inicializa una nueva instancia de Movement.
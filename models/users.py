@@ -15,6 +15,8 @@ class User():
         updated_at (date): Fecha de última actualización del registro.
     """
     
+    __slots__ = ('id', 'name', 'email', 'password', 'created_at', 'updated_at')
+    
     def __init__(self, id, name, email, password, created_at, updated_at):
         """
         Inicializa una nueva instancia de User.
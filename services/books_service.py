@@ -16,24 +16,72 @@ class BooksService:
     
     Esta clase maneja todas las operaciones relacionadas con libros,
     incluyendo creación, consulta, eliminación y control de inventario.
-    Mantiene una lista en memoria de libros disponibles en el catálogo.
+    Mantiene en memoria los libros del catálogo, indexados por ID.
     
     Attributes:
-        books (list[Book]): Lista de libros en el catálogo de la biblioteca.
+        books (tuple[Book, ...]): Libros del catálogo de la biblioteca, de solo lectura.
+        _libros_por_id (dict[int, Book]): Libros del catálogo indexados por ID.
     """
     
-    def __init__(self):
+    def __init__(self, persistencia=None):
         """
-        Inicializa el servicio de libros cargando desde archivo JSON.
+        Inicializa el servicio de libros.
+        
+        Los libros se cargan desde la persistencia la primera vez que se
+        consultan, por lo que crear el servicio no accede a la base de datos.
+        
+        Args:
+            persistencia (ServicioPersistencia, optional): Servicio de persistencia
+                a usar. Si no se indica, se crea uno nuevo.
+        """
+        self.persistencia = persistencia if persistencia is not None else ServicioPersistencia()
+        self._indice_por_id = None
+    
+    @property
+    def _libros_por_id(self):
+        """
+        Libros del catálogo indexados por ID, cargados en el primer acceso.
+        
+        Returns:
+            dict[int, Book]: Índice de libros por ID.
+        """
+        if self._indice_por_id is None:
+            self._cargar_libros()
+        return self._indice_por_id
+    
+    @property
+    def books(self):
+        """
+        Libros del catálogo, en orden de inserción.
+        
+        Returns:
+            tuple[Book, ...]: Libros en una tupla de solo lectura; para
+            modificarlos se usan los métodos del servicio.
+        """
+        return tuple(self._libros_por_id.values())
+    
+    def _cargar_libros(self):
+        """
+        Carga libros desde la base de datos SQLite y los convierte a objetos Book.
         Si no existen datos, crea libros de ejemplo por defecto.
         """
-        self.persistencia = ServicioPersistencia()
-        self.books = []
-        self._cargar_libros()
+        self._indice_por_id = {
+            datos['id']: Book(
+                datos['id'],
+                datos['title'],
+                datos['author'],
+                datos['published_date'],
+                datos['isbn'],
+                datos['quantity'],
+                datos['created_at'],
+                datos['updated_at']
+            )
+            for datos in self.persistencia.cargar_libros()
+        }
         
         # Si no hay libros, crear algunos por defecto
-        if not self.books:
-            self.books = [
+        if not self._indice_por_id:
+            libros = [
                 Book(
                     1,
                     "Cien años de soledad",
@@ -65,31 +113,15 @@ class BooksService:
                     dt.today().date(),
                 ),
             ]
+            self._indice_por_id = {libro.id: libro for libro in libros}
             self._guardar_libros()
     
-    def _cargar_libros(self):
-        """
-        Carga libros desde archivo JSON y los convierte a objetos Book.
-        """
-        datos_libros = self.persistencia.cargar_libros()
-        self.books = []
-        
-        for datos in datos_libros:
-            libro = Book(
-                datos['id'],
-                datos['title'],
-                datos['author'],
-                datos['published_date'],
-                datos['isbn'],
-                datos['quantity'],
-                datos['created_at'],
-                datos['updated_at']
-            )
-            self.books.append(libro)
-    
     def _guardar_libros(self):
         """
-        Guarda la lista actual de libros en archivo JSON.
+        Guarda la lista actual de libros en la base de datos SQLite.
+        
+        Sincroniza la tabla completa; los cambios de un solo libro usan
+        guardar_libro y eliminar_libro de la persistencia.
         """
         self.persistencia.guardar_libros(self.books)
 
@@ -114,7 +146,8 @@ class BooksService:
         Returns:
             Book or None: El objeto libro creado si fue exitoso, None si falló la validación.
         """
-        id = len(self.books) + 1
+        # Siguiente ID libre; len() + 1 podría repetir un ID tras eliminar libros
+        id = max(self._libros_por_id, default=0) + 1
         if len(isbn) != 10:
             print("❌❌❌ El ISBN debe tener 10 caracteres ❌❌❌")
             return None
@@ -138,8 +171,8 @@ class BooksService:
             dt.today().date(),
             dt.today().date(),
         )
-        self.books.append(book)
-        self._guardar_libros()
+        self._libros_por_id[book.id] = book
+        self.persistencia.guardar_libro(book)
         return book
 
     def get_all_books(self):
@@ -147,7 +180,7 @@ class BooksService:
         Obtiene todos los libros del catálogo.
         
         Returns:
-            list[Book]: Lista de todos los libros en el catálogo.
+            tuple[Book, ...]: Todos los libros del catálogo, de solo lectura.
         """
         return self.books
     
@@ -161,10 +194,7 @@ class BooksService:
         Returns:
             Book or None: El objeto libro si fue encontrado, None si no existe.
         """
-        for book in self.books:
-            if book.id == id:
-                return book
-        return None
+        return self._libros_por_id.get(id)
 
     def delete_book(self, id):
         """
@@ -177,12 +207,12 @@ class BooksService:
             Book or None: El objeto libro eliminado si fue encontrado, None si no existe.
         """
         print(f"Eliminando libro {id}...")
-        for book in self.books:
-            if book.id == id:
-                self.books.remove(book)
-                self._guardar_libros()
-                return book
-        return None
+        book = self._libros_por_id.pop(id, None)
+        if book is None:
+            return None
+        
+        self.persistencia.eliminar_libro(id)
+        return book
     
     def decrement_quantity(self, id):
         """
@@ -197,14 +227,14 @@ class BooksService:
             Book or None: El objeto libro actualizado si fue encontrado, None si no existe.
         """
         print(f"Disminuyendo cantidad del libro {id}...")
-        for book in self.books:
-            print(book.id == id)
-            if book.id == id:
-                book.quantity -= 1
-                book.updated_at = dt.today().date()
-                self._guardar_libros()
-                return book
-        return None
+        book = self._libros_por_id.get(id)
+        if book is None:
+            return None
+        
+        book.quantity -= 1
+        book.updated_at = dt.today().date()
+        self.persistencia.guardar_libro(book)
+        return book
     
     def increment_quantity(self, id):
         """
@@ -218,13 +248,14 @@ class BooksService:
         Returns:
             Book or None: El objeto libro actualizado si fue encontrado, None si no existe.
         """
-        for book in self.books:
-            if book.id == id:
-                book.quantity += 1
-                book.updated_at = dt.today().date()
-                self._guardar_libros()
-                return book
-        return None
+        book = self._libros_por_id.get(id)
+        if book is None:
+            return None
+        
+        book.quantity += 1
+        book.updated_at = dt.today().date()
+        self.persistencia.guardar_libro(book)
+        return book
     
     def obtener_libro_por_id(self, id):
         """
@@ -14,21 +14,38 @@ class ServicioCategorias:
         servicio_libros: Referencia al servicio de libros para validaciones.
     """
     
-    def __init__(self, servicio_libros=None):
+    def __init__(self, servicio_libros=None, persistencia=None):
         """
-        Inicializa el servicio de categorías cargando asignaciones desde archivo JSON.
+        Inicializa el servicio de categorías.
+        
+        El árbol y sus asignaciones se cargan desde la persistencia la primera
+        vez que se consultan.
         
         Args:
             servicio_libros: Instancia del servicio de libros para validaciones.
+            persistencia (ServicioPersistencia, optional): Servicio de persistencia
+                a usar. Si no se indica, se crea uno nuevo.
         """
-        self.persistencia = ServicioPersistencia()
-        self.arbol_categorias = ArbolCategorias()
+        self.persistencia = persistencia if persistencia is not None else ServicioPersistencia()
+        self._arbol_categorias = None
         self.servicio_libros = servicio_libros
-        self._cargar_asignaciones_categorias()
+    
+    @property
+    def arbol_categorias(self):
+        """
+        Árbol de categorías con sus asignaciones, cargado en el primer acceso.
+        
+        Returns:
+            ArbolCategorias: Instancia del árbol de categorías.
+        """
+        if self._arbol_categorias is None:
+            self._arbol_categorias = ArbolCategorias()
+            self._cargar_asignaciones_categorias()
+        return self._arbol_categorias
     
     def _cargar_asignaciones_categorias(self):
         """
-        Carga las asignaciones de libros a categorías desde archivo JSON.
+        Carga las asignaciones de libros a categorías desde la base de datos SQLite.
         """
         categorias_libros = self.persistencia.cargar_categorias_libros()
         
@@ -36,17 +53,19 @@ class ServicioCategorias:
         for nombre_categoria, ids_libros in categorias_libros.items():
             categoria = self.arbol_categorias.raiz.buscar_categoria(nombre_categoria)
             if categoria:
-                categoria.libros = ids_libros.copy()
+                categoria.establecer_libros(ids_libros)
     
     def _guardar_asignaciones_categorias(self):
         """
-        Guarda las asignaciones actuales de libros a categorías en archivo JSON.
+        Guarda las asignaciones actuales de libros a categorías en la base de datos SQLite.
         """
         categorias_libros = {}
         
         def _recopilar_asignaciones(nodo):
-            if nodo.libros:  # Solo guardar categorías con libros asignados
-                categorias_libros[nodo.nombre] = nodo.libros.copy()
+            # Solo guardar categorías con libros asignados; la persistencia
+            # acepta el conjunto directamente, sin ordenarlo en una lista
+            if nodo.libros:
+                categorias_libros[nodo.nombre] = nodo.libros
             
             for hijo in nodo.hijos:
                 _recopilar_asignaciones(hijo)
@@ -8,8 +8,10 @@ entre usuarios y libros, permitiendo recomendaciones basadas en:
 - Popularidad de libros
 """
 
+import heapq
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from operator import itemgetter
+from typing import Dict, Iterable, List, Set, Tuple
 
 
 class GraphService:
@@ -37,6 +39,11 @@ class GraphService:
         
         # Grafo usuario-usuario ponderado: {usuario: {usuario: peso}}
         self.user_user_graph: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        
+        # Versión del grafo: aumenta con cada préstamo registrado e invalida
+        # la popularidad memorizada en _popularidad_memorizada (versión, ranking)
+        self._version = 0
+        self._popularidad_memorizada: Tuple[int, Tuple[Tuple[int, int], ...]] = (-1, ())
     
     def registrar_prestamo(self, student_identification: str, book_id: int):
         """
@@ -55,10 +62,37 @@ class GraphService:
         # Agregar arista en el grafo bipartito (bidireccional)
         self.bipartite_graph[user_key].add(book_id)
         self.bipartite_graph[book_key].add(student_identification)
+        self._version += 1
         
         # Actualizar grafo usuario-usuario
         self._actualizar_grafo_usuario_usuario(student_identification, book_id)
     
+    def registrar_prestamos_bulk(self, prestamos: Iterable[Tuple[str, int]]):
+        """
+        Registra varios préstamos en el grafo de una sola vez.
+        
+        El resultado es el mismo que llamar a registrar_prestamo por cada par
+        en el mismo orden, pero sin una llamada a método por préstamo y
+        obteniendo una sola vez los conjuntos de adyacencia de cada arista.
+        
+        Args:
+            prestamos (Iterable[Tuple[str, int]]): Pares (identificación_estudiante, book_id).
+        """
+        grafo = self.bipartite_graph
+        user_user = self.user_user_graph
+        
+        for student_identification, book_id in prestamos:
+            grafo[f"user_{student_identification}"].add(book_id)
+            usuarios_del_libro = grafo[f"book_{book_id}"]
+            usuarios_del_libro.add(student_identification)
+            self._version += 1
+            
+            # Incrementar el peso con cada otro usuario del libro, en ambos sentidos
+            for otro_usuario in usuarios_del_libro:
+                if otro_usuario != student_identification:
+                    user_user[student_identification][otro_usuario] += 1
+                    user_user[otro_usuario][student_identification] += 1
+    
     def _actualizar_grafo_usuario_usuario(self, student_identification: str, book_id: int):
         """
         Actualiza el grafo usuario-usuario cuando se registra un nuevo préstamo.
@@ -122,11 +156,64 @@ class GraphService:
         if student_identification not in self.user_user_graph:
             return []
         
-        usuarios_similares = list(self.user_user_graph[student_identification].items())
-        # Ordenar por peso descendente
-        usuarios_similares.sort(key=lambda x: x[1], reverse=True)
+        # nlargest mantiene el orden estable de sorted(..., reverse=True)[:limite]
+        # sin ordenar todos los vecinos del usuario
+        return heapq.nlargest(limite, self.user_user_graph[student_identification].items(),
+                              key=itemgetter(1))
+    
+    def obtener_mapa_usuarios_similares(self, student_identification: str) -> Dict[str, int]:
+        """
+        Obtiene los pesos de todos los usuarios conectados a un usuario, sin ordenarlos.
+        
+        Args:
+            student_identification (str): Identificación del estudiante.
+            
+        Returns:
+            Dict[str, int]: Diccionario {identificación_usuario: peso}; vacío si el usuario no existe.
+        """
+        return dict(self.user_user_graph.get(student_identification, {}))
+    
+    def obtener_matriz_similaridad(self, usuarios: List[str]) -> List[List[int]]:
+        """
+        Construye la matriz de pesos usuario-usuario para los usuarios indicados.
+        
+        La posición [i][j] es la cantidad de libros compartidos entre usuarios[i]
+        y usuarios[j]; la diagonal es 0. Consultar la matriz no agrega nodos al grafo.
         
-        return usuarios_similares[:limite]
+        Args:
+            usuarios (List[str]): Identificaciones de los estudiantes, en el orden de filas y columnas.
+            
+        Returns:
+            List[List[int]]: Matriz cuadrada de pesos de tamaño len(usuarios).
+        """
+        filas = [self.user_user_graph.get(usuario, {}) for usuario in usuarios]
+        return [[pesos.get(otro, 0) for otro in usuarios] for pesos in filas]
+    
+    def snapshot_popularidad(self) -> Tuple[Tuple[int, int], ...]:
+        """
+        Obtiene el ranking completo de popularidad de los libros.
+        
+        El ranking se calcula una sola vez por versión del grafo; mientras no se
+        registren nuevos préstamos, las consultas reutilizan el mismo resultado.
+        
+        Returns:
+            Tuple[Tuple[int, int], ...]: Tuplas (book_id, cantidad_prestamos) ordenadas por popularidad descendente.
+        """
+        version, ranking = self._popularidad_memorizada
+        if version != self._version:
+            # Iterar sobre todos los nodos de libros en el grafo bipartito
+            popularidad = [
+                (int(nodo[5:]), len(vecinos))
+                for nodo, vecinos in self.bipartite_graph.items()
+                if nodo.startswith("book_")
+            ]
+            
+            # Ordenar por cantidad de préstamos descendente
+            popularidad.sort(key=itemgetter(1), reverse=True)
+            ranking = tuple(popularidad)
+            self._popularidad_memorizada = (self._version, ranking)
+        
+        return ranking
     
     def obtener_popularidad_libros(self, limite: int = 10) -> List[Tuple[int, int]]:
         """
@@ -138,19 +225,7 @@ class GraphService:
         Returns:
             List[Tuple[int, int]]: Lista de tuplas (book_id, cantidad_prestamos) ordenadas por popularidad descendente.
         """
-        popularidad = []
-        
-        # Iterar sobre todos los nodos de libros en el grafo bipartito
-        for nodo in self.bipartite_graph:
-            if nodo.startswith("book_"):
-                book_id = int(nodo.replace("book_", ""))
-                cantidad_prestamos = len(self.bipartite_graph[nodo])
-                popularidad.append((book_id, cantidad_prestamos))
-        
-        # Ordenar por cantidad de préstamos descendente
-        popularidad.sort(key=lambda x: x[1], reverse=True)
-        
-        return popularidad[:limite]
+        return list(self.snapshot_popularidad()[:limite])
     
     def recomendar_libros_por_historial(self, student_identification: str, 
                                        libros_existentes: List, 
@@ -174,14 +249,15 @@ class GraphService:
         # Obtener libros populares que el usuario no ha prestado
         popularidad = self.obtener_popularidad_libros(limite * 2)
         
+        libros_por_id = self._indexar_libros(libros_existentes)
+        
         recomendaciones = []
         for book_id, _ in popularidad:
             if book_id not in libros_prestados:
                 # Buscar el objeto Book correspondiente
-                for libro in libros_existentes:
-                    if libro.id == book_id:
-                        recomendaciones.append(libro)
-                        break
+                libro = libros_por_id.get(book_id)
+                if libro is not None:
+                    recomendaciones.append(libro)
                 if len(recomendaciones) >= limite:
                     break
         
@@ -216,21 +292,38 @@ class GraphService:
                     # El peso del libro es el peso del usuario multiplicado por la frecuencia
                     recomendaciones_contador[book_id] += peso
         
-        # Ordenar por peso descendente
-        libros_ordenados = sorted(recomendaciones_contador.items(), 
-                                 key=lambda x: x[1], 
-                                 reverse=True)
+        # Los de mayor peso primero
+        libros_ordenados = heapq.nlargest(limite, recomendaciones_contador.items(),
+                                          key=itemgetter(1))
         
         # Convertir IDs a objetos Book
+        libros_por_id = self._indexar_libros(libros_existentes)
         recomendaciones = []
-        for book_id, _ in libros_ordenados[:limite]:
-            for libro in libros_existentes:
-                if libro.id == book_id:
-                    recomendaciones.append(libro)
-                    break
+        for book_id, _ in libros_ordenados:
+            libro = libros_por_id.get(book_id)
+            if libro is not None:
+                recomendaciones.append(libro)
         
         return recomendaciones
     
+    @staticmethod
+    def _indexar_libros(libros_existentes: List) -> Dict[int, object]:
+        """
+        Indexa los libros por ID para resolver las recomendaciones sin recorrer la lista.
+        
+        Si hay IDs repetidos se conserva el primer libro, igual que la búsqueda lineal.
+        
+        Args:
+            libros_existentes (List): Lista de objetos Book disponibles.
+            
+        Returns:
+            Dict[int, object]: Diccionario {book_id: Book}.
+        """
+        libros_por_id = {}
+        for libro in libros_existentes:
+            libros_por_id.setdefault(libro.id, libro)
+        return libros_por_id
+    
     def obtener_estadisticas_grafo(self) -> Dict:
         """
         Obtiene estadísticas generales del grafo.
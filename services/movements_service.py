@@ -24,27 +24,55 @@ class MovementsService():
         books_service (BooksService): Referencia al servicio de libros para control de inventario.
     """
     
-    def __init__(self, books_service, graph_service=None):
+    def __init__(self, books_service, graph_service=None, persistencia=None):
         """
-        Inicializa el servicio de movimientos cargando desde archivo JSON.
+        Inicializa el servicio de movimientos.
+        
+        Los movimientos se cargan desde la persistencia la primera vez que se
+        consultan o al llamar a cargar(); en ese momento se registran en el
+        grafo los préstamos activos, por lo que crear el servicio no accede a
+        la base de datos.
         
         Args:
             books_service (BooksService): Instancia del servicio de libros para integración.
             graph_service (GraphService, optional): Instancia del servicio de grafos para registrar préstamos.
+            persistencia (ServicioPersistencia, optional): Servicio de persistencia
+                a usar. Si no se indica, se crea uno nuevo.
         """
-        self.persistencia = ServicioPersistencia()
-        self.movements = []
+        self.persistencia = persistencia if persistencia is not None else ServicioPersistencia()
+        self._movements = None
         self.books_service = books_service
         self.graph_service = graph_service
-        self._cargar_movimientos()
+    
+    def cargar(self):
+        """
+        Carga los movimientos si aún no se han cargado.
+        
+        Debe llamarse antes de consultar el grafo de préstamos, ya que los
+        préstamos activos se registran en él al cargar los movimientos.
+        Llamarlo de nuevo no tiene efecto.
+        """
+        if self._movements is None:
+            self._cargar_movimientos()
+    
+    @property
+    def movements(self):
+        """
+        Movimientos registrados, cargados en el primer acceso.
+        
+        Returns:
+            list[Movement]: Lista de movimientos registrados en el sistema.
+        """
+        self.cargar()
+        return self._movements
     
     def _cargar_movimientos(self):
         """
-        Carga movimientos desde archivo JSON y los convierte a objetos Movement.
+        Carga movimientos desde la base de datos SQLite y los convierte a objetos Movement.
         También registra los préstamos en el grafo si está disponible.
         """
         datos_movimientos = self.persistencia.cargar_movimientos()
-        self.movements = []
+        self._movements = []
         
         for datos in datos_movimientos:
             movimiento = Movement(
@@ -58,20 +86,15 @@ class MovementsService():
                 datos['created_at'],
                 datos['updated_at']
             )
-            self.movements.append(movimiento)
-            
-            # Registrar préstamo en el grafo si está disponible y no está devuelto
-            if self.graph_service and not datos['returned']:
-                self.graph_service.registrar_prestamo(
-                    datos['student_identification'],
-                    datos['book_id']
-                )
-    
-    def _guardar_movimientos(self):
-        """
-        Guarda la lista actual de movimientos en archivo JSON.
-        """
-        self.persistencia.guardar_movimientos(self.movements)
+            self._movements.append(movimiento)
+        
+        # Registrar en el grafo, de una sola vez, los préstamos no devueltos
+        if self.graph_service:
+            self.graph_service.registrar_prestamos_bulk(
+                (datos['student_identification'], datos['book_id'])
+                for datos in datos_movimientos
+                if not datos['returned']
+            )
     
     def add_movement(self, book_id, student_name, student_identification, return_date):
         """
@@ -110,20 +133,21 @@ class MovementsService():
             return None
         
         movement = Movement(id, book_id, student_name, student_identification, dt.today().date(), return_date, False, dt.today().date(), dt.today().date())
-        if movement:
+        # El stock del libro y el préstamo se guardan en una sola transacción
+        with self.persistencia.transaccion():
             uptaded_book = self.books_service.decrement_quantity(book_id)
             if uptaded_book:
                 print(f"Nuevo stock del libro {book_id} - {uptaded_book.title}: {uptaded_book.quantity}")
             else:
                 print(f"Error al disminuir la cantidad del libro {book_id}")
                 return None
+            self.persistencia.guardar_movimiento(movement)
         self.movements.append(movement)
         
         # Registrar préstamo en el grafo si está disponible
         if self.graph_service:
             self.graph_service.registrar_prestamo(student_identification, book_id)
         
-        self._guardar_movimientos()
         return movement
     
     def return_movement(self, id):
@@ -150,14 +174,16 @@ class MovementsService():
                 movement.returned = True
                 movement.return_date = dt.today().date()
                 
-                uptaded_book = self.books_service.increment_quantity(movement.book_id)
-                if uptaded_book:
-                    print(f"Nuevo stock del libro {movement.book_id} - {uptaded_book.title}: {uptaded_book.quantity}")
-                else:
-                    print(f"Error al incrementar la cantidad del libro {movement.book_id}")
-                    return None
-                
-                self._guardar_movimientos()
+                # El stock del libro y la devolución se guardan en una sola transacción
+                with self.persistencia.transaccion():
+                    uptaded_book = self.books_service.increment_quantity(movement.book_id)
+                    if uptaded_book:
+                        print(f"Nuevo stock del libro {movement.book_id} - {uptaded_book.title}: {uptaded_book.quantity}")
+                    else:
+                        print(f"Error al incrementar la cantidad del libro {movement.book_id}")
+                        return None
+                    
+                    self.persistencia.guardar_movimiento(movement)
                 return movement
         print("❌❌❌ Movimiento no encontrado ❌❌❌")
         return None
@@ -180,6 +206,7 @@ class MovementsService():
         - La identificación del estudiante no esté vacía
         - La identificación tenga exactamente 10 caracteres
         - La fecha de devolución no esté vacía
+        - La fecha de devolución tenga el formato YYYY-MM-DD
         
         Args:
             student_name (str): Nombre del estudiante.
@@ -201,6 +228,11 @@ class MovementsService():
         if return_date == "":
             print("❌❌❌ La fecha de devolución es requerida ❌❌❌")
             return False
+        try:
+            dt.strptime(return_date, "%Y-%m-%d")
+        except ValueError:
+            print("❌❌❌ La fecha de devolución debe tener el formato YYYY-MM-DD ❌❌❌")
+            return False
         return True
     
     def check_movement_by_book_id(self, book_id, student_identification):
@@ -8,9 +8,344 @@ reemplazando el sistema de archivos JSON por una base de datos relacional.
 import sqlite3
 import os
 import json
+import gzip
+import contextlib
+import functools
+import logging
+import threading
+import weakref
 from datetime import datetime, date
 from typing import Dict, List, Any
 
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa el módulo json estándar
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Conversión directa de fechas ISO sin pasar por datetime
+_fecha_desde_iso = date.fromisoformat
+
+# Las fechas de movimientos se guardan como días desde 1970-01-01 (INTEGER)
+_ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+# Conversión a texto por tipo exacto; evita recorrer el MRO con isinstance
+_FECHA_A_TEXTO = {datetime: datetime.isoformat, date: date.isoformat}
+
+# sqlite3 invoca estos adaptadores solo al enlazar parámetros de tipo fecha,
+# por lo que guardar_* puede pasar los atributos de los objetos sin convertir
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, datetime.isoformat)
+
+
+def _fecha_a_dias(valor):
+    """
+    Convierte una fecha al número de días desde 1970-01-01.
+    
+    Args:
+        valor (date | str | None): Fecha, texto ISO o None.
+        
+    Returns:
+        int | None: Días desde la época, o None si no hay fecha.
+        
+    Raises:
+        ValueError: Si el texto no es una fecha ISO; las columnas de fecha de
+            movimientos solo admiten días.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        valor = _fecha_desde_iso(valor[:10])
+    return valor.toordinal() - _ORDINAL_EPOCA
+
+
+def _memorizar_carga(copiar):
+    """
+    Decorador que memoriza el resultado de un método cargar_*.
+    
+    El resultado se guarda por hilo y por argumentos junto con la versión de
+    la base de datos en que se leyó: PRAGMA data_version cambia cuando otra
+    conexión confirma cambios y total_changes cuando los hace la propia
+    conexión. Mientras ninguno de los dos cambie se devuelve una copia del
+    resultado guardado. Un ROLLBACK no altera ninguno de los dos valores, por
+    lo que transaccion() y _deshacer_escritura vacían la caché al deshacer.
+    
+    Args:
+        copiar: Función que copia el resultado para que el llamador pueda
+                modificarlo sin alterar la caché.
+    """
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, *args):
+            conn = self.conn
+            version = (conn.execute('PRAGMA data_version').fetchone()[0], conn.total_changes)
+            cache = self._local.cache
+            clave = (metodo.__name__, *args)
+            entrada = cache.get(clave)
+            if entrada is None or entrada[0] != version:
+                entrada = (version, metodo(self, *args))
+                cache[clave] = entrada
+            return copiar(entrada[1])
+        return envoltura
+    return decorador
+
+
+def _copiar_registros(registros):
+    """Copia una lista de diccionarios de registros."""
+    return [dict(registro) for registro in registros]
+
+
+def _copiar_categorias(categorias):
+    """Copia un diccionario {categoría: {ids}}."""
+    return {nombre: set(ids) for nombre, ids in categorias.items()}
+
+
+def _copiar_indice(indice):
+    """Copia un diccionario {valor: registro}."""
+    return {valor: dict(registro) for valor, registro in indice.items()}
+
+
+class _Conexion(sqlite3.Connection):
+    """
+    Conexión SQLite que admite referencias débiles.
+    
+    sqlite3.Connection no las admite; la subclase permite registrar las
+    conexiones de cada hilo sin impedir que se liberen cuando el hilo termina.
+    """
+
+
+def _password_a_blob(password):
+    """
+    Convierte una contraseña a bytes para guardarla como BLOB.
+    
+    Args:
+        password (str | bytes): Contraseña o hash de la contraseña.
+        
+    Returns:
+        bytes: Contraseña codificada en UTF-8, o los mismos bytes si ya lo eran.
+    """
+    return password if isinstance(password, bytes) else password.encode('utf-8')
+
+
+def _dias_a_texto_sql(columna):
+    """
+    Expresión SQL que convierte una columna de días desde 1970-01-01 a texto ISO.
+    
+    Args:
+        columna (str): Nombre de la columna.
+        
+    Returns:
+        str: Expresión SQL; los valores que no son enteros se dejan igual.
+    """
+    return (f"CASE WHEN typeof({columna}) = 'integer' "
+            f"THEN date({columna} * 86400, 'unixepoch') ELSE {columna} END")
+
+
+# Tamaño del búfer de escritura de los respaldos
+_TAMANO_BUFER_ESCRITURA = 1 << 16
+
+# Filas serializadas por SQLite que se escriben juntas en el respaldo compacto
+_FILAS_POR_BLOQUE = 1000
+
+# Lectura de JSON desde bytes; orjson los decodifica directamente
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Listas de IDs que se pasan a json_each al guardar. Deben enlazarse como
+# texto: SQLite interpreta un BLOB como JSON binario (JSONB). Sin orjson se
+# usa la misma salida compacta, sin espacios ni escapes de caracteres no ASCII.
+if orjson is not None:
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+else:
+    _json_dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+# Sentencias SQL de uso frecuente. Se definen una sola vez para que el
+# texto sea idéntico en cada llamada y la caché de sentencias preparadas de
+# la conexión reutilice el programa ya compilado.
+# La contraseña se guarda como BLOB y se lee como texto, que es lo que espera User
+_SQL_SELECT_USUARIOS = (
+    'SELECT id, name, email, CAST(password AS TEXT) AS password, created_at, updated_at FROM usuarios'
+)
+_SQL_SELECT_LIBROS = (
+    'SELECT id, title, author, published_date, isbn, quantity, created_at, updated_at FROM libros'
+)
+_SQL_SELECT_MOVIMIENTOS = (
+    'SELECT id, book_id, student_name, student_identification, loan_date, return_date, '
+    'returned, created_at, updated_at FROM movimientos'
+)
+# SQLite agrupa los IDs de cada categoría en una cadena separada por comas
+_SQL_SELECT_CATEGORIAS_LIBROS = (
+    'SELECT categoria_nombre, group_concat(libro_id) FROM categorias_libros '
+    'GROUP BY categoria_nombre'
+)
+
+_SQL_UPSERT_USUARIOS = '''
+    INSERT INTO usuarios (id, name, email, password, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name,
+        email = excluded.email,
+        password = excluded.password,
+        updated_at = excluded.updated_at
+    WHERE name IS NOT excluded.name
+       OR email IS NOT excluded.email
+       OR password IS NOT excluded.password
+       OR updated_at IS NOT excluded.updated_at
+'''
+_SQL_UPSERT_LIBROS = '''
+    INSERT INTO libros (id, title, author, published_date, isbn, quantity, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        title = excluded.title,
+        author = excluded.author,
+        published_date = excluded.published_date,
+        isbn = excluded.isbn,
+        quantity = excluded.quantity,
+        updated_at = excluded.updated_at
+    WHERE title IS NOT excluded.title
+       OR author IS NOT excluded.author
+       OR published_date IS NOT excluded.published_date
+       OR isbn IS NOT excluded.isbn
+       OR quantity IS NOT excluded.quantity
+       OR updated_at IS NOT excluded.updated_at
+'''
+_SQL_UPSERT_MOVIMIENTOS = '''
+    INSERT INTO movimientos (id, book_id, student_name, student_identification,
+                             loan_date, return_date, returned, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        book_id = excluded.book_id,
+        student_name = excluded.student_name,
+        student_identification = excluded.student_identification,
+        loan_date = excluded.loan_date,
+        return_date = excluded.return_date,
+        returned = excluded.returned,
+        updated_at = excluded.updated_at
+    WHERE book_id IS NOT excluded.book_id
+       OR student_name IS NOT excluded.student_name
+       OR student_identification IS NOT excluded.student_identification
+       OR loan_date IS NOT excluded.loan_date
+       OR return_date IS NOT excluded.return_date
+       OR returned IS NOT excluded.returned
+       OR updated_at IS NOT excluded.updated_at
+'''
+
+# Las fechas de movimientos son días desde 1970-01-01
+_SQL_CREAR_MOVIMIENTOS = '''
+    CREATE TABLE IF NOT EXISTS movimientos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        book_id INTEGER NOT NULL,
+        student_name TEXT NOT NULL,
+        student_identification TEXT NOT NULL,
+        loan_date INTEGER NOT NULL,
+        return_date INTEGER,
+        returned INTEGER NOT NULL DEFAULT 0,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL,
+        FOREIGN KEY (book_id) REFERENCES libros(id)
+    )
+'''
+
+# Borrado de las filas cuyo id no aparece en la lista JSON recibida
+_SQL_ELIMINAR_AUSENTES = {
+    tabla: f'DELETE FROM {tabla} WHERE id NOT IN (SELECT value FROM json_each(?))'
+    for tabla in ('usuarios', 'libros', 'movimientos')
+}
+# Borrado de los usuarios cuyo email pasa a otro id de la lista JSON de pares
+# [id, email]: la UPSERT fila a fila chocaría con UNIQUE(email) si dos usuarios
+# intercambian su email. Sus ids siguen en la lista, así que la UPSERT los
+# vuelve a insertar con los datos nuevos.
+_SQL_LIBERAR_EMAILS = '''
+    DELETE FROM usuarios
+    WHERE id IN (
+        SELECT usuarios.id
+        FROM json_each(?) AS nuevo
+        JOIN usuarios ON usuarios.email = json_extract(nuevo.value, '$[1]')
+        WHERE usuarios.id IS NOT json_extract(nuevo.value, '$[0]')
+    )
+'''
+_SQL_ELIMINAR_ASIGNACIONES_AUSENTES = '''
+    DELETE FROM categorias_libros
+    WHERE (categoria_nombre, libro_id) NOT IN (
+        SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]')
+        FROM json_each(?)
+    )
+'''
+_SQL_INSERTAR_ASIGNACION = '''
+    INSERT OR IGNORE INTO categorias_libros (categoria_nombre, libro_id)
+    VALUES (?, ?)
+'''
+
+# Método cargar_* de cada colección que se puede indexar con indice()
+_CARGAS_POR_COLECCION = {
+    'usuarios': 'cargar_usuarios',
+    'libros': 'cargar_libros',
+    'movimientos': 'cargar_movimientos',
+}
+
+# Los guardados por lotes usan un SAVEPOINT en lugar de BEGIN: fuera de una
+# transacción abre y confirma una propia, y dentro de transaccion() se anida
+# en ella, de modo que un error deshace solo ese guardado
+_SQL_SAVEPOINT = 'SAVEPOINT guardado'
+_SQL_RELEASE = 'RELEASE guardado'
+_SQL_ROLLBACK_SAVEPOINT = 'ROLLBACK TO guardado'
+
+
+
+def _consultas_respaldo(seccion, columnas):
+    """
+    Construye las consultas con que se exporta una tabla al respaldo.
+    
+    Args:
+        seccion (str): Nombre de la tabla y de la sección del respaldo.
+        columnas (tuple): Tuplas (nombre, expresión SQL, es_booleana).
+        
+    Returns:
+        tuple: (seccion, consulta de filas, consulta json_object, nombres de
+        las columnas booleanas).
+    """
+    filas = 'SELECT ' + ', '.join(
+        f'{expresion} AS {nombre}' for nombre, expresion, _ in columnas
+    ) + f' FROM {seccion}'
+    objetos = 'SELECT json_object(' + ', '.join(
+        f"'{nombre}', "
+        + (f"json(CASE WHEN {expresion} THEN 'true' ELSE 'false' END)" if booleana else expresion)
+        for nombre, expresion, booleana in columnas
+    ) + f') FROM {seccion}'
+    booleanas = tuple(nombre for nombre, _, booleana in columnas if booleana)
+    return seccion, filas, objetos, booleanas
+
+
+# Secciones del respaldo en orden de escritura. Las fechas se exportan como
+# texto ISO; las de movimientos se convierten en la propia consulta.
+_SECCIONES_RESPALDO = (
+    _consultas_respaldo('usuarios', (
+        ('id', 'id', False),
+        ('name', 'name', False),
+        ('email', 'email', False),
+        ('password', 'CAST(password AS TEXT)', False),
+        ('created_at', 'created_at', False),
+        ('updated_at', 'updated_at', False),
+    )),
+    _consultas_respaldo('libros', tuple(
+        (columna, columna, False)
+        for columna in ('id', 'title', 'author', 'published_date', 'isbn', 'quantity',
+                        'created_at', 'updated_at')
+    )),
+    _consultas_respaldo('movimientos', (
+        ('id', 'id', False),
+        ('book_id', 'book_id', False),
+        ('student_name', 'student_name', False),
+        ('student_identification', 'student_identification', False),
+        ('loan_date', _dias_a_texto_sql('loan_date'), False),
+        ('return_date', _dias_a_texto_sql('return_date'), False),
+        ('returned', 'returned', True),
+        ('created_at', _dias_a_texto_sql('created_at'), False),
+        ('updated_at', _dias_a_texto_sql('updated_at'), False),
+    )),
+)
+
 
 class ServicioPersistencia:
     """
@@ -21,7 +356,7 @@ class ServicioPersistencia:
     
     Attributes:
         db_path (str): Ruta al archivo de base de datos SQLite.
-        conn: Conexión a la base de datos.
+        conn: Conexión a la base de datos del hilo actual.
     """
     
     def __init__(self, directorio_datos="datos"):
@@ -40,12 +375,35 @@ class ServicioPersistencia:
         self.archivo_movimientos = os.path.join(directorio_datos, "movimientos.json")
         self.archivo_categorias_libros = os.path.join(directorio_datos, "categorias_libros.json")
         
+        # Funciones de codificación JSON para respaldos, configuradas una sola
+        # vez. orjson y json producen exactamente el mismo texto con estas
+        # opciones, por lo que el formato del respaldo no depende de cuál esté
+        # disponible.
+        if orjson is not None:
+            self._codificar_json = lambda obj: orjson.dumps(
+                obj, default=self._serializar_fecha_json
+            ).decode('utf-8')
+            self._codificar_json_legible = lambda obj: orjson.dumps(
+                obj, default=self._serializar_fecha_json, option=orjson.OPT_INDENT_2
+            ).decode('utf-8')
+        else:
+            self._codificar_json = json.JSONEncoder(
+                ensure_ascii=False, separators=(',', ':'), default=self._serializar_fecha_json
+            ).encode
+            self._codificar_json_legible = json.JSONEncoder(
+                ensure_ascii=False, indent=2, default=self._serializar_fecha_json
+            ).encode
+        
         # Crear directorio si no existe
         self._crear_directorio_datos()
         
-        # Inicializar conexión a SQLite
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
+        # Cada hilo usa su propia conexión a SQLite, abierta al primer uso.
+        # En modo WAL los lectores de distintas conexiones avanzan en paralelo
+        # en lugar de turnarse sobre una sola conexión compartida.
+        self._local = threading.local()
+        self._conexiones = weakref.WeakSet()
+        self._bloqueo_conexiones = threading.Lock()
+        
         self._crear_tablas()
         
         # Migrar datos de JSON a SQLite si existen
@@ -55,14 +413,90 @@ class ServicioPersistencia:
         """
         Crea el directorio de datos si no existe.
         """
-        if not os.path.exists(self.directorio_datos):
-            os.makedirs(self.directorio_datos)
+        os.makedirs(self.directorio_datos, exist_ok=True)
+    
+    @property
+    def conn(self):
+        """
+        Conexión SQLite del hilo actual; se abre la primera vez que se usa.
+        
+        Returns:
+            sqlite3.Connection: Conexión del hilo que llama.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._abrir_conexion()
+        return conn
+    
+    @property
+    def _cursor(self):
+        """
+        Cursor de larga duración de la conexión del hilo actual.
+        
+        Returns:
+            sqlite3.Cursor: Cursor que devuelve tuplas simples.
+        """
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            self._abrir_conexion()
+            cursor = self._local.cursor
+        return cursor
+    
+    def _abrir_conexion(self):
+        """
+        Abre y configura la conexión SQLite del hilo actual.
+        
+        Returns:
+            sqlite3.Connection: Conexión recién abierta.
+        """
+        # isolation_level=None: sin BEGIN implícitos; cada método de escritura
+        # abre su propia transacción o SAVEPOINT y la cierra explícitamente
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, cached_statements=256,
+            isolation_level=None, factory=_Conexion
+        )
+        conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
+        self._configurar_conexion(conn)
+        
+        # Cursor de larga duración para guardar_* y cargar_*. Devuelve tuplas
+        # simples: las consultas usan columnas explícitas de orden fijo y no
+        # hace falta construir el mapa de nombres de sqlite3.Row
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        
+        self._local.conn = conn
+        self._local.cursor = cursor
+        self._local.cache = {}
+        with self._bloqueo_conexiones:
+            self._conexiones.add(conn)
+        return conn
+    
+    def _configurar_conexion(self, conn):
+        """
+        Ajusta los PRAGMA de SQLite para mejorar el rendimiento.
+        
+        El modo WAL convierte las escrituras en anexos secuenciales al registro
+        y permite lecturas concurrentes con el escritor; con él, synchronous=NORMAL
+        evita un fsync por cada commit sin arriesgar la integridad de la base.
+        
+        Args:
+            conn (sqlite3.Connection): Conexión a configurar.
+        """
+        if self.db_path != ":memory:":
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript('''
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-20000;
+            PRAGMA mmap_size=268435456;
+        ''')
     
     def _crear_tablas(self):
         """
         Crea las tablas necesarias en la base de datos si no existen.
         """
         cursor = self.conn.cursor()
+        cursor.execute('BEGIN')
         
         # Tabla de usuarios
         cursor.execute('''
@@ -70,7 +504,7 @@ class ServicioPersistencia:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
                 email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
+                password BLOB NOT NULL,
                 created_at DATE NOT NULL,
                 updated_at DATE NOT NULL
             )
@@ -91,20 +525,7 @@ class ServicioPersistencia:
         ''')
         
         # Tabla de movimientos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS movimientos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                book_id INTEGER NOT NULL,
-                student_name TEXT NOT NULL,
-                student_identification TEXT NOT NULL,
-                loan_date DATE NOT NULL,
-                return_date DATE,
-                returned INTEGER NOT NULL DEFAULT 0,
-                created_at DATE NOT NULL,
-                updated_at DATE NOT NULL,
-                FOREIGN KEY (book_id) REFERENCES libros(id)
-            )
-        ''')
+        cursor.execute(_SQL_CREAR_MOVIMIENTOS)
         
         # Tabla de relación categorías-libros
         cursor.execute('''
@@ -116,7 +537,68 @@ class ServicioPersistencia:
             )
         ''')
         
+        # Índices secundarios para búsquedas por libro e ISBN. usuarios(email)
+        # ya tiene el índice implícito de su restricción UNIQUE.
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_movimientos_book_id ON movimientos(book_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_libros_isbn ON libros(isbn)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_categorias_libros_libro_id ON categorias_libros(libro_id)')
+        
         self.conn.commit()
+        
+        self._migrar_fechas_movimientos(cursor)
+    
+    def _migrar_fechas_movimientos(self, cursor):
+        """
+        Convierte las fechas de movimientos de texto ISO a días desde 1970-01-01.
+        
+        Solo actúa sobre bases creadas con el esquema anterior, en el que las
+        columnas de fecha de movimientos estaban declaradas como DATE. La
+        tabla se reconstruye en una sola transacción. Si alguna fecha no es
+        válida la tabla se deja sin convertir y se registra el error, ya que
+        las columnas INTEGER solo admiten días.
+        
+        Args:
+            cursor: Cursor de la conexión.
+        """
+        tipos = {fila[1]: fila[2] for fila in cursor.execute('PRAGMA table_info(movimientos)')}
+        if tipos.get('loan_date', 'INTEGER').upper() == 'INTEGER':
+            return
+        
+        def a_dias(columna):
+            # date() descarta la hora: julianday de una fecha sin hora es
+            # exacto y CAST no trunca hacia cero las fechas anteriores a 1970
+            return f'CAST(julianday(date({columna})) - 2440587.5 AS INTEGER)'
+        
+        columnas = ('loan_date', 'return_date', 'created_at', 'updated_at')
+        ids_invalidos = [fila[0] for fila in cursor.execute(
+            'SELECT id FROM movimientos WHERE '
+            + ' OR '.join(f'({c} IS NOT NULL AND date({c}) IS NULL)' for c in columnas)
+        )]
+        if ids_invalidos:
+            logger.error("⚠️ No se convirtieron las fechas de movimientos; "
+                         "fechas no válidas en los movimientos %s", ids_invalidos)
+            return
+        
+        cursor.execute('BEGIN')
+        try:
+            cursor.execute('ALTER TABLE movimientos RENAME TO movimientos_texto')
+            cursor.execute('DROP INDEX IF EXISTS idx_movimientos_book_id')
+            cursor.execute(_SQL_CREAR_MOVIMIENTOS)
+            cursor.execute(f'''
+                INSERT INTO movimientos (id, book_id, student_name, student_identification,
+                                         loan_date, return_date, returned, created_at, updated_at)
+                SELECT id, book_id, student_name, student_identification,
+                       {a_dias('loan_date')}, {a_dias('return_date')}, returned,
+                       {a_dias('created_at')}, {a_dias('updated_at')}
+                FROM movimientos_texto
+            ''')
+            cursor.execute('DROP TABLE movimientos_texto')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_movimientos_book_id ON movimientos(book_id)')
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        logger.info("✅ Fechas de movimientos convertidas a días desde 1970-01-01")
     
     def _migrar_datos_json_a_sqlite(self):
         """
@@ -134,168 +616,237 @@ class ServicioPersistencia:
             if usuarios_count > 0:
                 return
             
+            # Listar el directorio una sola vez en lugar de un stat por archivo
+            with os.scandir(self.directorio_datos) as entradas:
+                existentes = {entrada.path for entrada in entradas}
+            
             # Intentar cargar datos de JSON
-            if os.path.exists(self.archivo_usuarios):
+            if self.archivo_usuarios in existentes:
                 self._migrar_usuarios_json()
             
-            if os.path.exists(self.archivo_libros):
+            if self.archivo_libros in existentes:
                 self._migrar_libros_json()
             
-            if os.path.exists(self.archivo_movimientos):
+            if self.archivo_movimientos in existentes:
                 self._migrar_movimientos_json()
             
-            if os.path.exists(self.archivo_categorias_libros):
+            if self.archivo_categorias_libros in existentes:
                 self._migrar_categorias_json()
                 
-        except Exception as e:
-            print(f"⚠️ Advertencia al migrar datos: {e}")
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("⚠️ Advertencia al migrar datos: %s", e)
     
     def _migrar_usuarios_json(self):
         """Migra usuarios de JSON a SQLite."""
         try:
-            with open(self.archivo_usuarios, 'r', encoding='utf-8') as f:
-                usuarios = json.load(f)
+            with open(self.archivo_usuarios, 'rb') as f:
+                usuarios = _json_loads(f.read())
             
+            # Un solo valor por defecto para todas las filas sin fecha
+            hoy = date.today()
             cursor = self.conn.cursor()
-            for usuario in usuarios:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO usuarios (id, name, email, password, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
+            cursor.execute('BEGIN')
+            cursor.executemany('''
+                INSERT OR IGNORE INTO usuarios (id, name, email, password, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                (
                     usuario['id'],
                     usuario['name'],
                     usuario['email'],
-                    usuario['password'],
-                    usuario.get('created_at', date.today().isoformat()),
-                    usuario.get('updated_at', date.today().isoformat())
-                ))
+                    _password_a_blob(usuario['password']),
+                    usuario.get('created_at', hoy),
+                    usuario.get('updated_at', hoy)
+                )
+                for usuario in usuarios
+            ))
             self.conn.commit()
-            print("✅ Usuarios migrados de JSON a SQLite")
-        except Exception as e:
-            print(f"⚠️ Error al migrar usuarios: {e}")
+            logger.info("✅ Usuarios migrados de JSON a SQLite")
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            self.conn.rollback()
+            logger.error("⚠️ Error al migrar usuarios: %s", e)
     
     def _migrar_libros_json(self):
         """Migra libros de JSON a SQLite."""
         try:
-            with open(self.archivo_libros, 'r', encoding='utf-8') as f:
-                libros = json.load(f)
+            with open(self.archivo_libros, 'rb') as f:
+                libros = _json_loads(f.read())
             
+            # Un solo valor por defecto para todas las filas sin fecha
+            hoy = date.today()
             cursor = self.conn.cursor()
-            for libro in libros:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO libros (id, title, author, published_date, isbn, quantity, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+            cursor.execute('BEGIN')
+            cursor.executemany('''
+                INSERT OR IGNORE INTO libros (id, title, author, published_date, isbn, quantity, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                (
                     libro['id'],
                     libro['title'],
                     libro['author'],
                     libro.get('published_date', ''),
                     libro['isbn'],
                     libro['quantity'],
-                    libro.get('created_at', date.today().isoformat()),
-                    libro.get('updated_at', date.today().isoformat())
-                ))
+                    libro.get('created_at', hoy),
+                    libro.get('updated_at', hoy)
+                )
+                for libro in libros
+            ))
             self.conn.commit()
-            print("✅ Libros migrados de JSON a SQLite")
-        except Exception as e:
-            print(f"⚠️ Error al migrar libros: {e}")
+            logger.info("✅ Libros migrados de JSON a SQLite")
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            self.conn.rollback()
+            logger.error("⚠️ Error al migrar libros: %s", e)
     
     def _migrar_movimientos_json(self):
         """Migra movimientos de JSON a SQLite."""
         try:
-            with open(self.archivo_movimientos, 'r', encoding='utf-8') as f:
-                movimientos = json.load(f)
+            with open(self.archivo_movimientos, 'rb') as f:
+                movimientos = _json_loads(f.read())
             
+            # Un solo valor por defecto para todas las filas sin fecha
+            hoy = date.today()
             cursor = self.conn.cursor()
-            for movimiento in movimientos:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO movimientos 
-                    (id, book_id, student_name, student_identification, loan_date, return_date, returned, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+            cursor.execute('BEGIN')
+            cursor.executemany('''
+                INSERT OR IGNORE INTO movimientos 
+                (id, book_id, student_name, student_identification, loan_date, return_date, returned, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                (
                     movimiento['id'],
                     movimiento['book_id'],
                     movimiento['student_name'],
                     movimiento['student_identification'],
-                    movimiento.get('loan_date', date.today().isoformat()),
-                    movimiento.get('return_date'),
+                    _fecha_a_dias(movimiento.get('loan_date', hoy)),
+                    _fecha_a_dias(movimiento.get('return_date')),
                     1 if movimiento.get('returned', False) else 0,
-                    movimiento.get('created_at', date.today().isoformat()),
-                    movimiento.get('updated_at', date.today().isoformat())
-                ))
+                    _fecha_a_dias(movimiento.get('created_at', hoy)),
+                    _fecha_a_dias(movimiento.get('updated_at', hoy))
+                )
+                for movimiento in movimientos
+            ))
             self.conn.commit()
-            print("✅ Movimientos migrados de JSON a SQLite")
-        except Exception as e:
-            print(f"⚠️ Error al migrar movimientos: {e}")
+            logger.info("✅ Movimientos migrados de JSON a SQLite")
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            self.conn.rollback()
+            logger.error("⚠️ Error al migrar movimientos: %s", e)
     
     def _migrar_categorias_json(self):
         """Migra categorías de JSON a SQLite."""
         try:
-            with open(self.archivo_categorias_libros, 'r', encoding='utf-8') as f:
-                categorias = json.load(f)
+            with open(self.archivo_categorias_libros, 'rb') as f:
+                categorias = _json_loads(f.read())
             
+            # Una sentencia por categoría: json_each expande la lista de IDs
+            # dentro de SQLite sin iterarla en Python
             cursor = self.conn.cursor()
-            for categoria_nombre, ids_libros in categorias.items():
-                for libro_id in ids_libros:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO categorias_libros (categoria_nombre, libro_id)
-                        VALUES (?, ?)
-                    ''', (categoria_nombre, libro_id))
+            cursor.execute('BEGIN')
+            cursor.executemany('''
+                INSERT OR IGNORE INTO categorias_libros (categoria_nombre, libro_id)
+                SELECT ?, value FROM json_each(?)
+            ''', [
+                (categoria_nombre, _json_dumps(ids_libros))
+                for categoria_nombre, ids_libros in categorias.items()
+            ])
             self.conn.commit()
-            print("✅ Categorías migradas de JSON a SQLite")
-        except Exception as e:
-            print(f"⚠️ Error al migrar categorías: {e}")
+            logger.info("✅ Categorías migradas de JSON a SQLite")
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            self.conn.rollback()
+            logger.error("⚠️ Error al migrar categorías: %s", e)
     
-    def _convertir_fecha_a_string(self, obj):
+    def _convertir_string_a_fecha(self, fecha_str):
         """
-        Convierte objetos datetime y date a string para JSON.
+        Convierte string ISO a objeto date.
         
         Args:
-            obj: Objeto a convertir.
+            fecha_str (str): Fecha en formato ISO string.
             
         Returns:
-            str o objeto original: String si es fecha, objeto original si no.
+            date: Objeto date, o None si el valor está vacío o no es una fecha ISO.
         """
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        return obj
+        if not fecha_str:
+            return None
+        try:
+            # Los primeros 10 caracteres son la fecha (AAAA-MM-DD) tanto en
+            # valores date como en valores datetime
+            return _fecha_desde_iso(fecha_str[:10])
+        except ValueError:
+            return None
     
-    def _convertir_string_a_fecha(self, fecha_str):
+    def _dias_a_fecha(self, valor):
         """
-        Convierte string ISO a objeto date.
+        Convierte un valor de fecha de movimientos a objeto date.
         
         Args:
-            fecha_str (str): Fecha en formato ISO string.
+            valor (int | str | None): Días desde 1970-01-01 o texto ISO heredado.
             
         Returns:
-            date: Objeto date o None si hay error.
+            date: Objeto date, o None si el valor está vacío o no es válido.
         """
-        try:
-            if 'T' in fecha_str:
-                # Es datetime, convertir a date
-                return datetime.fromisoformat(fecha_str).date()
-            else:
-                # Es date
-                return datetime.fromisoformat(fecha_str).date()
-        except:
-            return date.today()
+        if isinstance(valor, int):
+            try:
+                return date.fromordinal(valor + _ORDINAL_EPOCA)
+            except (ValueError, OverflowError):
+                return None
+        return self._convertir_string_a_fecha(valor)
     
-    def _objeto_a_diccionario(self, obj):
+    def _eliminar_filas_ausentes(self, cursor, tabla, ids):
         """
-        Convierte un objeto a diccionario para serialización JSON.
+        Elimina de una tabla las filas cuyo id no aparece en la lista dada.
         
         Args:
-            obj: Objeto a convertir.
-            
-        Returns:
-            dict: Diccionario con los atributos del objeto.
+            cursor: Cursor de la transacción en curso.
+            tabla (str): Nombre de la tabla (usuarios, libros o movimientos).
+            ids (list[int]): IDs que deben conservarse.
+        """
+        cursor.execute(_SQL_ELIMINAR_AUSENTES[tabla], (_json_dumps(ids),))
+    
+    def _deshacer_escritura(self, cursor):
+        """
+        Deshace un guardado por lotes que falló y cierra su SAVEPOINT.
+        
+        Las cargas memorizadas durante el guardado pueden contener filas
+        deshechas, así que se descartan.
+        
+        Args:
+            cursor: Cursor con el que se abrió el SAVEPOINT.
         """
-        if hasattr(obj, '__dict__'):
-            diccionario = {}
-            for clave, valor in obj.__dict__.items():
-                diccionario[clave] = self._convertir_fecha_a_string(valor)
-            return diccionario
-        return obj
+        if self.conn.in_transaction:
+            try:
+                cursor.execute(_SQL_ROLLBACK_SAVEPOINT)
+                cursor.execute(_SQL_RELEASE)
+            except sqlite3.Error:
+                # El SAVEPOINT no llegó a abrirse
+                pass
+            self._local.cache.clear()
+    
+    @contextlib.contextmanager
+    def transaccion(self):
+        """
+        Agrupa varias operaciones de guardado en una sola transacción.
+        
+        Los guardar_* y eliminar_* llamados dentro del bloque se confirman
+        juntos al salir, con un solo commit; si el bloque lanza una excepción
+        se deshacen todos, junto con las cargas memorizadas dentro del bloque.
+        Las transacciones anidadas se unen a la externa.
+        
+        Yields:
+            ServicioPersistencia: El propio servicio.
+        """
+        conn = self.conn
+        if conn.in_transaction:
+            yield self
+            return
+        
+        conn.execute('BEGIN')
+        try:
+            yield self
+        except BaseException:
+            conn.rollback()
+            self._local.cache.clear()
+            raise
+        conn.commit()
     
     def guardar_usuarios(self, usuarios):
         """
@@ -307,32 +858,91 @@ class ServicioPersistencia:
         Returns:
             bool: True si se guardó exitosamente.
         """
+        cursor = self._cursor
         try:
-            cursor = self.conn.cursor()
+            cursor.execute(_SQL_SAVEPOINT)
             
-            # Eliminar todos los usuarios existentes
-            cursor.execute('DELETE FROM usuarios')
+            # Eliminar solo los usuarios que ya no están en la lista
+            self._eliminar_filas_ausentes(cursor, 'usuarios', [usuario.id for usuario in usuarios])
             
-            # Insertar usuarios
-            for usuario in usuarios:
-                cursor.execute('''
-                    INSERT INTO usuarios (id, name, email, password, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
+            # Liberar los emails que cambian de dueño dentro de la lista
+            cursor.execute(_SQL_LIBERAR_EMAILS, (
+                _json_dumps([[usuario.id, usuario.email] for usuario in usuarios]),
+            ))
+            
+            # Insertar o actualizar usuarios en un solo lote; las filas
+            # sin cambios no se reescriben. La contraseña se enlaza como BLOB.
+            a_blob = _password_a_blob
+            cursor.executemany(_SQL_UPSERT_USUARIOS, [
+                (
                     usuario.id,
                     usuario.name,
                     usuario.email,
-                    usuario.password,
-                    self._convertir_fecha_a_string(usuario.created_at),
-                    self._convertir_fecha_a_string(usuario.updated_at)
-                ))
+                    a_blob(usuario.password),
+                    usuario.created_at,
+                    usuario.updated_at
+                )
+                for usuario in usuarios
+            ])
             
-            self.conn.commit()
+            cursor.execute(_SQL_RELEASE)
+            return True
+        except sqlite3.Error as e:
+            self._deshacer_escritura(cursor)
+            logger.error("❌ Error al guardar usuarios: %s", e)
+            return False
+        except BaseException:
+            # Cualquier otro error (por ejemplo al convertir una fila) no debe
+            # dejar abierto el SAVEPOINT en la conexión del hilo
+            self._deshacer_escritura(cursor)
+            raise
+    
+    def guardar_usuario(self, usuario):
+        """
+        Inserta o actualiza un solo usuario en la base de datos SQLite.
+        
+        A diferencia de guardar_usuarios, no recorre la tabla completa, por
+        lo que es la opción adecuada cuando cambia un único usuario.
+        
+        Args:
+            usuario (User): Usuario a guardar.
+            
+        Returns:
+            bool: True si se guardó exitosamente.
+        """
+        try:
+            # Una sola sentencia en modo autocommit es su propia transacción
+            self._cursor.execute(_SQL_UPSERT_USUARIOS, (
+                usuario.id,
+                usuario.name,
+                usuario.email,
+                _password_a_blob(usuario.password),
+                usuario.created_at,
+                usuario.updated_at
+            ))
+            return True
+        except sqlite3.Error as e:
+            logger.error("❌ Error al guardar usuario %s: %s", usuario.id, e)
+            return False
+    
+    def eliminar_usuario(self, id_usuario):
+        """
+        Elimina un solo usuario de la base de datos SQLite.
+        
+        Args:
+            id_usuario (int): ID del usuario a eliminar.
+            
+        Returns:
+            bool: True si se eliminó exitosamente.
+        """
+        try:
+            self._cursor.execute('DELETE FROM usuarios WHERE id = ?', (id_usuario,))
             return True
-        except Exception as e:
-            print(f"❌ Error al guardar usuarios: {e}")
+        except sqlite3.Error as e:
+            logger.error("❌ Error al eliminar usuario %s: %s", id_usuario, e)
             return False
     
+    @_memorizar_carga(_copiar_registros)
     def cargar_usuarios(self):
         """
         Carga la lista de usuarios desde la base de datos SQLite.
@@ -341,25 +951,25 @@ class ServicioPersistencia:
             list: Lista de diccionarios con datos de usuarios.
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM usuarios')
-            rows = cursor.fetchall()
-            
-            usuarios = []
-            for row in rows:
-                usuario = {
-                    'id': row['id'],
-                    'name': row['name'],
-                    'email': row['email'],
-                    'password': row['password'],
-                    'created_at': self._convertir_string_a_fecha(row['created_at']),
-                    'updated_at': self._convertir_string_a_fecha(row['updated_at'])
+            cursor = self._cursor
+            cursor.execute(_SQL_SELECT_USUARIOS)
+            s2d = self._convertir_string_a_fecha
+            
+            usuarios = [
+                {
+                    'id': fila[0],
+                    'name': fila[1],
+                    'email': fila[2],
+                    'password': fila[3],
+                    'created_at': s2d(fila[4]),
+                    'updated_at': s2d(fila[5])
                 }
-                usuarios.append(usuario)
+                for fila in cursor.fetchall()
+            ]
             
             return usuarios
-        except Exception as e:
-            print(f"❌ Error al cargar usuarios: {e}")
+        except sqlite3.Error as e:
+            logger.error("❌ Error al cargar usuarios: %s", e)
             return []
     
     def guardar_libros(self, libros):
@@ -372,34 +982,84 @@ class ServicioPersistencia:
         Returns:
             bool: True si se guardó exitosamente.
         """
+        cursor = self._cursor
         try:
-            cursor = self.conn.cursor()
+            cursor.execute(_SQL_SAVEPOINT)
             
-            # Eliminar todos los libros existentes
-            cursor.execute('DELETE FROM libros')
+            # Eliminar solo los libros que ya no están en la lista
+            self._eliminar_filas_ausentes(cursor, 'libros', [libro.id for libro in libros])
             
-            # Insertar libros
-            for libro in libros:
-                cursor.execute('''
-                    INSERT INTO libros (id, title, author, published_date, isbn, quantity, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+            # Insertar o actualizar libros en un solo lote; las filas
+            # sin cambios no se reescriben
+            cursor.executemany(_SQL_UPSERT_LIBROS, [
+                (
                     libro.id,
                     libro.title,
                     libro.author,
                     libro.published_date,
                     libro.isbn,
                     libro.quantity,
-                    self._convertir_fecha_a_string(libro.created_at),
-                    self._convertir_fecha_a_string(libro.updated_at)
-                ))
+                    libro.created_at,
+                    libro.updated_at
+                )
+                for libro in libros
+            ])
             
-            self.conn.commit()
+            cursor.execute(_SQL_RELEASE)
+            return True
+        except sqlite3.Error as e:
+            self._deshacer_escritura(cursor)
+            logger.error("❌ Error al guardar libros: %s", e)
+            return False
+        except BaseException:
+            self._deshacer_escritura(cursor)
+            raise
+    
+    def guardar_libro(self, libro):
+        """
+        Inserta o actualiza un solo libro en la base de datos SQLite.
+        
+        Args:
+            libro (Book): Libro a guardar.
+            
+        Returns:
+            bool: True si se guardó exitosamente.
+        """
+        try:
+            # Una sola sentencia en modo autocommit es su propia transacción
+            self._cursor.execute(_SQL_UPSERT_LIBROS, (
+                libro.id,
+                libro.title,
+                libro.author,
+                libro.published_date,
+                libro.isbn,
+                libro.quantity,
+                libro.created_at,
+                libro.updated_at
+            ))
             return True
-        except Exception as e:
-            print(f"❌ Error al guardar libros: {e}")
+        except sqlite3.Error as e:
+            logger.error("❌ Error al guardar libro %s: %s", libro.id, e)
             return False
     
+    def eliminar_libro(self, id_libro):
+        """
+        Elimina un solo libro de la base de datos SQLite.
+        
+        Args:
+            id_libro (int): ID del libro a eliminar.
+            
+        Returns:
+            bool: True si se eliminó exitosamente.
+        """
+        try:
+            self._cursor.execute('DELETE FROM libros WHERE id = ?', (id_libro,))
+            return True
+        except sqlite3.Error as e:
+            logger.error("❌ Error al eliminar libro %s: %s", id_libro, e)
+            return False
+    
+    @_memorizar_carga(_copiar_registros)
     def cargar_libros(self):
         """
         Carga la lista de libros desde la base de datos SQLite.
@@ -408,27 +1068,27 @@ class ServicioPersistencia:
             list: Lista de diccionarios con datos de libros.
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM libros')
-            rows = cursor.fetchall()
-            
-            libros = []
-            for row in rows:
-                libro = {
-                    'id': row['id'],
-                    'title': row['title'],
-                    'author': row['author'],
-                    'published_date': row['published_date'],
-                    'isbn': row['isbn'],
-                    'quantity': row['quantity'],
-                    'created_at': self._convertir_string_a_fecha(row['created_at']),
-                    'updated_at': self._convertir_string_a_fecha(row['updated_at'])
+            cursor = self._cursor
+            cursor.execute(_SQL_SELECT_LIBROS)
+            s2d = self._convertir_string_a_fecha
+            
+            libros = [
+                {
+                    'id': fila[0],
+                    'title': fila[1],
+                    'author': fila[2],
+                    'published_date': fila[3],
+                    'isbn': fila[4],
+                    'quantity': fila[5],
+                    'created_at': s2d(fila[6]),
+                    'updated_at': s2d(fila[7])
                 }
-                libros.append(libro)
+                for fila in cursor.fetchall()
+            ]
             
             return libros
-        except Exception as e:
-            print(f"❌ Error al cargar libros: {e}")
+        except sqlite3.Error as e:
+            logger.error("❌ Error al cargar libros: %s", e)
             return []
     
     def guardar_movimientos(self, movimientos):
@@ -441,36 +1101,74 @@ class ServicioPersistencia:
         Returns:
             bool: True si se guardó exitosamente.
         """
+        cursor = self._cursor
         try:
-            cursor = self.conn.cursor()
+            cursor.execute(_SQL_SAVEPOINT)
             
-            # Eliminar todos los movimientos existentes
-            cursor.execute('DELETE FROM movimientos')
+            # Eliminar solo los movimientos que ya no están en la lista
+            self._eliminar_filas_ausentes(cursor, 'movimientos', [movimiento.id for movimiento in movimientos])
             
-            # Insertar movimientos
-            for movimiento in movimientos:
-                cursor.execute('''
-                    INSERT INTO movimientos (id, book_id, student_name, student_identification, 
-                                          loan_date, return_date, returned, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+            # Insertar o actualizar movimientos en un solo lote; las filas
+            # sin cambios no se reescriben. Las fechas se guardan como días
+            # desde 1970-01-01.
+            a_dias = _fecha_a_dias
+            cursor.executemany(_SQL_UPSERT_MOVIMIENTOS, [
+                (
                     movimiento.id,
                     movimiento.book_id,
                     movimiento.student_name,
                     movimiento.student_identification,
-                    self._convertir_fecha_a_string(movimiento.loan_date),
-                    self._convertir_fecha_a_string(movimiento.return_date),
+                    a_dias(movimiento.loan_date),
+                    a_dias(movimiento.return_date),
                     1 if movimiento.returned else 0,
-                    self._convertir_fecha_a_string(movimiento.created_at),
-                    self._convertir_fecha_a_string(movimiento.updated_at)
-                ))
+                    a_dias(movimiento.created_at),
+                    a_dias(movimiento.updated_at)
+                )
+                for movimiento in movimientos
+            ])
             
-            self.conn.commit()
+            cursor.execute(_SQL_RELEASE)
             return True
-        except Exception as e:
-            print(f"❌ Error al guardar movimientos: {e}")
+        except sqlite3.Error as e:
+            self._deshacer_escritura(cursor)
+            logger.error("❌ Error al guardar movimientos: %s", e)
             return False
+        except BaseException:
+            self._deshacer_escritura(cursor)
+            raise
     
+    def guardar_movimiento(self, movimiento):
+        """
+        Inserta o actualiza un solo movimiento en la base de datos SQLite.
+        
+        Registrar un préstamo o una devolución solo escribe la fila afectada
+        en lugar de sincronizar la tabla completa.
+        
+        Args:
+            movimiento (Movement): Movimiento a guardar.
+            
+        Returns:
+            bool: True si se guardó exitosamente.
+        """
+        try:
+            # Una sola sentencia en modo autocommit es su propia transacción
+            self._cursor.execute(_SQL_UPSERT_MOVIMIENTOS, (
+                movimiento.id,
+                movimiento.book_id,
+                movimiento.student_name,
+                movimiento.student_identification,
+                _fecha_a_dias(movimiento.loan_date),
+                _fecha_a_dias(movimiento.return_date),
+                1 if movimiento.returned else 0,
+                _fecha_a_dias(movimiento.created_at),
+                _fecha_a_dias(movimiento.updated_at)
+            ))
+            return True
+        except sqlite3.Error as e:
+            logger.error("❌ Error al guardar movimiento %s: %s", movimiento.id, e)
+            return False
+    
+    @_memorizar_carga(_copiar_registros)
     def cargar_movimientos(self):
         """
         Carga la lista de movimientos desde la base de datos SQLite.
@@ -479,28 +1177,51 @@ class ServicioPersistencia:
             list: Lista de diccionarios con datos de movimientos.
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM movimientos')
-            rows = cursor.fetchall()
-            
-            movimientos = []
-            for row in rows:
-                movimiento = {
-                    'id': row['id'],
-                    'book_id': row['book_id'],
-                    'student_name': row['student_name'],
-                    'student_identification': row['student_identification'],
-                    'loan_date': self._convertir_string_a_fecha(row['loan_date']),
-                    'return_date': self._convertir_string_a_fecha(row['return_date']) if row['return_date'] else None,
-                    'returned': bool(row['returned']),
-                    'created_at': self._convertir_string_a_fecha(row['created_at']),
-                    'updated_at': self._convertir_string_a_fecha(row['updated_at'])
-                }
-                movimientos.append(movimiento)
+            cursor = self._cursor
+            cursor.execute(_SQL_SELECT_MOVIMIENTOS)
+            filas = cursor.fetchall()
+            
+            try:
+                # Camino rápido: las fechas son días desde 1970-01-01 y se
+                # convierten con date.fromordinal en línea
+                fo = date.fromordinal
+                epoca = _ORDINAL_EPOCA
+                movimientos = [
+                    {
+                        'id': fila[0],
+                        'book_id': fila[1],
+                        'student_name': fila[2],
+                        'student_identification': fila[3],
+                        'loan_date': fo(fila[4] + epoca),
+                        'return_date': fo(fila[5] + epoca) if fila[5] is not None else None,
+                        'returned': bool(fila[6]),
+                        'created_at': fo(fila[7] + epoca),
+                        'updated_at': fo(fila[8] + epoca)
+                    }
+                    for fila in filas
+                ]
+            except (TypeError, ValueError, OverflowError):
+                # Alguna fecha quedó guardada como texto: convertir campo a
+                # campo tolerando errores
+                a_fecha = self._dias_a_fecha
+                movimientos = [
+                    {
+                        'id': fila[0],
+                        'book_id': fila[1],
+                        'student_name': fila[2],
+                        'student_identification': fila[3],
+                        'loan_date': a_fecha(fila[4]),
+                        'return_date': a_fecha(fila[5]),
+                        'returned': bool(fila[6]),
+                        'created_at': a_fecha(fila[7]),
+                        'updated_at': a_fecha(fila[8])
+                    }
+                    for fila in filas
+                ]
             
             return movimientos
-        except Exception as e:
-            print(f"❌ Error al cargar movimientos: {e}")
+        except sqlite3.Error as e:
+            logger.error("❌ Error al cargar movimientos: %s", e)
             return []
     
     def guardar_categorias_libros(self, categorias_libros):
@@ -508,107 +1229,256 @@ class ServicioPersistencia:
         Guarda las asignaciones de categorías a libros en la base de datos SQLite.
         
         Args:
-            categorias_libros (dict): Diccionario con estructura {nombre_categoria: [ids_libros]}.
+            categorias_libros (dict): Diccionario con estructura {nombre_categoria: ids_libros},
+                                      donde ids_libros es cualquier iterable (lista o conjunto).
             
         Returns:
             bool: True si se guardó exitosamente.
         """
+        cursor = self._cursor
         try:
-            cursor = self.conn.cursor()
+            cursor.execute(_SQL_SAVEPOINT)
             
-            # Eliminar todas las asignaciones existentes
-            cursor.execute('DELETE FROM categorias_libros')
+            asignaciones = [
+                (categoria_nombre, libro_id)
+                for categoria_nombre, ids_libros in categorias_libros.items()
+                for libro_id in ids_libros
+            ]
             
-            # Insertar asignaciones
-            for categoria_nombre, ids_libros in categorias_libros.items():
-                for libro_id in ids_libros:
-                    cursor.execute('''
-                        INSERT INTO categorias_libros (categoria_nombre, libro_id)
-                        VALUES (?, ?)
-                    ''', (categoria_nombre, libro_id))
+            # Eliminar solo las asignaciones que ya no existen
+            cursor.execute(_SQL_ELIMINAR_ASIGNACIONES_AUSENTES, (_json_dumps(asignaciones),))
             
-            self.conn.commit()
+            # Insertar las asignaciones nuevas en un solo lote
+            cursor.executemany(_SQL_INSERTAR_ASIGNACION, asignaciones)
+            
+            cursor.execute(_SQL_RELEASE)
             return True
-        except Exception as e:
-            print(f"❌ Error al guardar categorías de libros: {e}")
+        except sqlite3.Error as e:
+            self._deshacer_escritura(cursor)
+            logger.error("❌ Error al guardar categorías de libros: %s", e)
             return False
+        except BaseException:
+            self._deshacer_escritura(cursor)
+            raise
     
+    @_memorizar_carga(_copiar_categorias)
     def cargar_categorias_libros(self):
         """
         Carga las asignaciones de categorías a libros desde la base de datos SQLite.
         
         Returns:
-            dict: Diccionario con estructura {nombre_categoria: [ids_libros]}.
+            dict: Diccionario con estructura {nombre_categoria: {ids_libros}}.
+                  Los IDs se devuelven como conjunto para comprobar la
+                  pertenencia de un libro sin recorrer la lista.
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM categorias_libros')
-            rows = cursor.fetchall()
-            
-            categorias_libros = {}
-            for row in rows:
-                categoria_nombre = row['categoria_nombre']
-                libro_id = row['libro_id']
-                
-                if categoria_nombre not in categorias_libros:
-                    categorias_libros[categoria_nombre] = []
-                categorias_libros[categoria_nombre].append(libro_id)
+            cursor = self._cursor
+            cursor.execute(_SQL_SELECT_CATEGORIAS_LIBROS)
             
-            return categorias_libros
-        except Exception as e:
-            print(f"❌ Error al cargar categorías de libros: {e}")
+            # Una entrada del diccionario por categoría en lugar de una
+            # búsqueda y un add por cada asignación
+            return {
+                categoria_nombre: set(map(int, ids_libros.split(',')))
+                for categoria_nombre, ids_libros in cursor
+            }
+        except sqlite3.Error as e:
+            logger.error("❌ Error al cargar categorías de libros: %s", e)
             return {}
     
-    def _preparar_datos_para_json(self, datos):
+    @_memorizar_carga(_copiar_indice)
+    def indice(self, coleccion, campo):
         """
-        Convierte objetos date en los datos a strings para JSON.
+        Indexa los registros de una colección por el valor de un campo.
+        
+        Permite comprobar si existe un registro con un valor dado, o
+        recuperarlo, con una búsqueda en un diccionario en lugar de recorrer
+        la lista. El índice se guarda en la misma caché que las cargas.
         
         Args:
-            datos: Lista de diccionarios con posibles objetos date.
+            coleccion (str): 'usuarios', 'libros' o 'movimientos'.
+            campo (str): Campo cuyo valor se usa como clave, por ejemplo 'email'.
             
         Returns:
-            list: Datos con fechas convertidas a string.
+            dict: Diccionario con estructura {valor: registro}. Si varios
+                  registros comparten el valor se conserva el último.
+            
+        Raises:
+            ValueError: Si la colección no existe.
         """
-        datos_convertidos = []
-        for item in datos:
-            item_convertido = {}
-            for clave, valor in item.items():
-                item_convertido[clave] = self._convertir_fecha_a_string(valor)
-            datos_convertidos.append(item_convertido)
-        return datos_convertidos
+        cargar = _CARGAS_POR_COLECCION.get(coleccion)
+        if cargar is None:
+            raise ValueError(f"Colección desconocida: {coleccion}")
+        return {registro[campo]: registro for registro in getattr(self, cargar)()}
     
-    def exportar_todo(self, nombre_archivo="respaldo_completo.json"):
+    def _serializar_fecha_json(self, obj):
+        """
+        Función ``default`` para el codificador JSON.
+        
+        El codificador solo la invoca para valores que no sabe serializar,
+        por lo que las fechas se convierten sin copiar los diccionarios.
+        
+        Args:
+            obj: Objeto que el codificador no pudo serializar.
+            
+        Returns:
+            str: Fecha en formato ISO.
+            
+        Raises:
+            TypeError: Si el objeto no es una fecha.
+        """
+        convertir = _FECHA_A_TEXTO.get(type(obj))
+        if convertir is None:
+            raise TypeError(f"Objeto de tipo {type(obj).__name__} no serializable a JSON")
+        return convertir(obj)
+    
+    def _escribir_archivo_atomico(self, ruta, fragmentos, comprimir=False):
+        """
+        Escribe un archivo de forma atómica a partir de fragmentos de texto.
+        
+        Los fragmentos se escriben a medida que se generan en un archivo
+        temporal que luego reemplaza al destino, de modo que nunca queda un
+        archivo a medio escribir si el proceso se interrumpe.
+        
+        Args:
+            ruta (str): Ruta del archivo destino.
+            fragmentos: Iterable de cadenas a escribir en orden.
+            comprimir (bool): Si comprimir el contenido con gzip (nivel 1).
+        """
+        # Nombre temporal único por proceso e hilo: dos respaldos simultáneos
+        # al mismo destino no se pisan el archivo temporal
+        ruta_temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            # Búfer de 64 KB: los fragmentos (uno por fila) se acumulan y se
+            # escriben al disco en bloques grandes
+            with open(ruta_temporal, 'wb', buffering=_TAMANO_BUFER_ESCRITURA) as archivo:
+                destino = gzip.GzipFile(fileobj=archivo, mode='wb', compresslevel=1) if comprimir else archivo
+                try:
+                    for fragmento in fragmentos:
+                        destino.write(fragmento.encode('utf-8'))
+                finally:
+                    if comprimir:
+                        destino.close()
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(ruta_temporal, ruta)
+        except BaseException:
+            # Borrar directamente en lugar de consultar antes si existe:
+            # un stat menos y sin carrera entre la consulta y el borrado
+            try:
+                os.unlink(ruta_temporal)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    def _fragmentos_respaldo(self, formato_legible):
+        """
+        Genera el JSON del respaldo por partes, fila por fila.
+        
+        Las filas se leen directamente de los cursores, por lo que nunca se
+        mantiene en memoria una tabla completa. En formato compacto SQLite
+        entrega cada fila ya serializada con json_object y solo se copia el
+        texto; en formato legible cada fila se codifica con indentación. La
+        salida es idéntica a la que produciría el codificador sobre el
+        diccionario completo.
+        
+        Args:
+            formato_legible (bool): Si indentar el JSON con dos espacios.
+            
+        Yields:
+            str: Siguiente fragmento del documento JSON.
+        """
+        if formato_legible:
+            codificar = self._codificar_json_legible
+            salto = lambda nivel: '\n' + '  ' * nivel
+            separador = lambda nivel: ',\n' + '  ' * nivel
+            dos_puntos = ': '
+        else:
+            codificar = self._codificar_json
+            salto = lambda nivel: ''
+            separador = lambda nivel: ','
+            dos_puntos = ':'
+        
+        yield '{' + salto(1) + '"fecha_exportacion"' + dos_puntos + codificar(datetime.now().isoformat())
+        
+        for seccion, consulta_filas, consulta_objetos, booleanas in _SECCIONES_RESPALDO:
+            yield separador(1) + codificar(seccion) + dos_puntos + '['
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            if formato_legible:
+                cursor.execute(consulta_filas)
+                columnas = [descripcion[0] for descripcion in cursor.description]
+                prefijo = salto(2)
+                for fila in cursor:
+                    registro = dict(zip(columnas, fila))
+                    for columna in booleanas:
+                        registro[columna] = bool(registro[columna])
+                    # Sangrar el objeto al nivel de los elementos de la lista
+                    yield prefijo + codificar(registro).replace('\n', salto(2))
+                    prefijo = separador(2)
+                # Una lista vacía se escribe como "[]" sin saltos de línea
+                yield ('' if prefijo == salto(2) else salto(1)) + ']'
+            else:
+                # Las filas llegan ya serializadas; se unen en bloques para
+                # escribir pocos fragmentos grandes sin cargar la tabla entera
+                cursor.execute(consulta_objetos)
+                separador_bloque = ''
+                while True:
+                    bloque = cursor.fetchmany(_FILAS_POR_BLOQUE)
+                    if not bloque:
+                        break
+                    yield separador_bloque + ','.join([fila[0] for fila in bloque])
+                    separador_bloque = ','
+                yield ']'
+        
+        # JSON no tiene conjuntos: los IDs se escriben como lista ordenada
+        categorias = codificar({
+            nombre: sorted(ids) for nombre, ids in self.cargar_categorias_libros().items()
+        })
+        if formato_legible:
+            categorias = categorias.replace('\n', salto(1))
+        yield separador(1) + '"categorias_libros"' + dos_puntos + categorias + salto(0) + '}'
+    
+    def exportar_todo(self, nombre_archivo="respaldo_completo.json", formato_legible=False,
+                      comprimir=False):
         """
         Exporta todos los datos a un solo archivo de respaldo.
         
+        Las tablas se escriben fila por fila desde los cursores de SQLite,
+        sin cargarlas antes en memoria.
+        
         Args:
             nombre_archivo (str): Nombre del archivo de respaldo.
+            formato_legible (bool): Si indentar el JSON para lectura humana.
+                                    Por defecto se escribe compacto.
+            comprimir (bool): Si comprimir el respaldo con gzip (nivel 1).
+                              Se agrega la extensión ".gz" al nombre del archivo.
             
         Returns:
             bool: True si se exportó exitosamente.
         """
         try:
-            # Cargar datos y convertir fechas a string para JSON
-            usuarios_raw = self.cargar_usuarios()
-            libros_raw = self.cargar_libros()
-            movimientos_raw = self.cargar_movimientos()
-            
-            datos_completos = {
-                'fecha_exportacion': datetime.now().isoformat(),
-                'usuarios': self._preparar_datos_para_json(usuarios_raw),
-                'libros': self._preparar_datos_para_json(libros_raw),
-                'movimientos': self._preparar_datos_para_json(movimientos_raw),
-                'categorias_libros': self.cargar_categorias_libros()
-            }
-            
+            if comprimir and not nombre_archivo.endswith('.gz'):
+                nombre_archivo += '.gz'
             ruta_respaldo = os.path.join(self.directorio_datos, nombre_archivo)
-            with open(ruta_respaldo, 'w', encoding='utf-8') as archivo:
-                json.dump(datos_completos, archivo, ensure_ascii=False, indent=2)
             
-            print(f"✅ Respaldo completo guardado en: {ruta_respaldo}")
+            # Leer las cuatro tablas dentro de una sola transacción de lectura:
+            # se adquiere el bloqueo compartido una única vez y el respaldo
+            # refleja un estado consistente de la base de datos
+            transaccion_propia = not self.conn.in_transaction
+            if transaccion_propia:
+                self.conn.execute('BEGIN')
+            try:
+                self._escribir_archivo_atomico(
+                    ruta_respaldo, self._fragmentos_respaldo(formato_legible), comprimir
+                )
+            finally:
+                if transaccion_propia:
+                    self.conn.commit()
+            
+            logger.info("✅ Respaldo completo guardado en: %s", ruta_respaldo)
             return True
-        except Exception as e:
-            print(f"❌ Error al crear respaldo: {e}")
+        except (OSError, sqlite3.Error, TypeError, ValueError) as e:
+            logger.error("❌ Error al crear respaldo: %s", e)
             return False
     
     def obtener_estadisticas_archivos(self):
@@ -621,18 +1491,14 @@ class ServicioPersistencia:
         try:
             cursor = self.conn.cursor()
             
-            # Contar registros en cada tabla
-            cursor.execute('SELECT COUNT(*) FROM usuarios')
-            count_usuarios = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM libros')
-            count_libros = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM movimientos')
-            count_movimientos = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(DISTINCT categoria_nombre) FROM categorias_libros')
-            count_categorias = cursor.fetchone()[0]
+            # Contar registros de todas las tablas en una sola consulta
+            cursor.execute('''
+                SELECT (SELECT COUNT(*) FROM usuarios),
+                       (SELECT COUNT(*) FROM libros),
+                       (SELECT COUNT(*) FROM movimientos),
+                       (SELECT COUNT(DISTINCT categoria_nombre) FROM categorias_libros)
+            ''')
+            count_usuarios, count_libros, count_movimientos, count_categorias = cursor.fetchone()
             
             estadisticas = {
                 'usuarios': {
@@ -654,8 +1520,8 @@ class ServicioPersistencia:
             }
             
             return estadisticas
-        except Exception as e:
-            print(f"❌ Error al obtener estadísticas: {e}")
+        except sqlite3.Error as e:
+            logger.error("❌ Error al obtener estadísticas: %s", e)
             return {
                 'usuarios': {'existe': False, 'cantidad': 0},
                 'libros': {'existe': False, 'cantidad': 0},
@@ -665,10 +1531,24 @@ class ServicioPersistencia:
     
     def cerrar(self):
         """
-        Cierra la conexión a la base de datos.
+        Cierra las conexiones a la base de datos de todos los hilos.
         """
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
+        bloqueo = getattr(self, '_bloqueo_conexiones', None)
+        if bloqueo is None:
+            return
+        with bloqueo:
+            conexiones = list(self._conexiones)
+            self._conexiones.clear()
+            # Descartar las conexiones guardadas en los hilos
+            self._local = threading.local()
+        
+        for conn in conexiones:
+            try:
+                # Actualizar estadísticas del planificador antes de cerrar
+                conn.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                pass
+            conn.close()
     
     def __del__(self):
         """
@@ -5,6 +5,7 @@ Este módulo contiene la lógica de negocio para la gestión de usuarios
 del sistema de biblioteca, incluyendo operaciones CRUD y autenticación.
 """
 
+import hmac
 from datetime import datetime as dt
 from models.users import User
 from services.persistencia_service import ServicioPersistencia
@@ -15,49 +16,95 @@ class UsersService():
     
     Esta clase maneja todas las operaciones relacionadas con usuarios,
     incluyendo creación, autenticación, consulta y eliminación de usuarios.
-    Mantiene una lista en memoria de usuarios registrados.
+    Mantiene en memoria los usuarios registrados, indexados por ID y por email.
     
     Attributes:
-        users (list[User]): Lista de usuarios registrados en el sistema.
+        users (tuple[User, ...]): Usuarios registrados en el sistema, de solo lectura.
+        _usuarios_por_id (dict[int, User]): Usuarios registrados indexados por ID.
+        _usuarios_por_email (dict[str, User]): Índice de usuarios por email.
     """
     
-    def __init__(self):
+    def __init__(self, persistencia=None):
         """
-        Inicializa el servicio de usuarios cargando datos desde archivo JSON.
-        Si no existen datos, crea un usuario administrador por defecto.
+        Inicializa el servicio de usuarios.
+        
+        Los usuarios se cargan desde la persistencia la primera vez que se
+        consultan, por lo que crear el servicio no accede a la base de datos.
+        
+        Args:
+            persistencia (ServicioPersistencia, optional): Servicio de persistencia
+                a usar. Si no se indica, se crea uno nuevo.
         """
-        self.persistencia = ServicioPersistencia()
-        self.users = []
-        self._cargar_usuarios()
+        self.persistencia = persistencia if persistencia is not None else ServicioPersistencia()
         
-        # Si no hay usuarios, crear administrador por defecto
-        if not self.users:
-            self.users = [User(1, "Admin", "admin@example.com", "123456", dt.today().date(), dt.today().date())]
-            self._guardar_usuarios()
+        # Los índices se construyen en el primer acceso, no al crear el servicio
+        self._indice_por_id = None
+        self._indice_por_email = None
+    
+    @property
+    def _usuarios_por_id(self):
+        """
+        Usuarios registrados indexados por ID, cargados en el primer acceso.
+        
+        Returns:
+            dict[int, User]: Índice de usuarios por ID.
+        """
+        if self._indice_por_id is None:
+            self._cargar_usuarios()
+        return self._indice_por_id
+    
+    @property
+    def _usuarios_por_email(self):
+        """
+        Usuarios registrados indexados por email, cargados en el primer acceso.
+        
+        Returns:
+            dict[str, User]: Índice de usuarios por email.
+        """
+        if self._indice_por_email is None:
+            self._cargar_usuarios()
+        return self._indice_por_email
+    
+    @property
+    def users(self):
+        """
+        Usuarios registrados, en orden de inserción.
+        
+        Returns:
+            tuple[User, ...]: Usuarios en una tupla de solo lectura; para
+            modificarlos se usan los métodos del servicio.
+        """
+        return tuple(self._usuarios_por_id.values())
     
     def _cargar_usuarios(self):
         """
-        Carga usuarios desde archivo JSON y los convierte a objetos User.
-        """
-        datos_usuarios = self.persistencia.cargar_usuarios()
-        self.users = []
-        
-        for datos in datos_usuarios:
-            usuario = User(
-                datos['id'],
-                datos['name'],
-                datos['email'],
-                datos['password'],
-                datos['created_at'],
-                datos['updated_at']
-            )
-            self.users.append(usuario)
+        Carga usuarios desde la persistencia y los convierte a objetos User.
+        Si no existen datos, crea un usuario administrador por defecto.
+        
+        Los diccionarios de cargar_usuarios tienen las mismas claves que los
+        parámetros de User, por lo que se construyen en una sola pasada.
+        """
+        self._indice_por_id = {
+            datos['id']: User(**datos) for datos in self.persistencia.cargar_usuarios()
+        }
+        self._indice_por_email = {usuario.email: usuario for usuario in self._indice_por_id.values()}
+        
+        # Si no hay usuarios, crear administrador por defecto
+        if not self._indice_por_id:
+            hoy = dt.today().date()
+            admin = User(1, "Admin", "admin@example.com", "123456", hoy, hoy)
+            self._indexar_usuario(admin)
+            self.persistencia.guardar_usuario(admin)
     
-    def _guardar_usuarios(self):
+    def _indexar_usuario(self, usuario):
         """
-        Guarda la lista actual de usuarios en archivo JSON.
+        Registra un usuario en los índices por email y por ID.
+        
+        Args:
+            usuario (User): Usuario a indexar.
         """
-        self.persistencia.guardar_usuarios(self.users)
+        self._usuarios_por_email[usuario.email] = usuario
+        self._usuarios_por_id[usuario.id] = usuario
     
     def add_user(self, email, password, name):
         """
@@ -66,6 +113,7 @@ class UsersService():
         Valida los datos del usuario antes de crearlo:
         - La contraseña debe tener al menos 6 caracteres
         - El email debe tener exactamente un símbolo @
+        - El email no debe pertenecer a otro usuario registrado
         - El nombre, email y contraseña se limpian de espacios en blanco
         
         Args:
@@ -76,7 +124,8 @@ class UsersService():
         Returns:
             User or None: El objeto usuario creado si fue exitoso, None si falló la validación.
         """
-        id = len(self.users) + 1
+        # Siguiente ID libre; len() + 1 podría repetir un ID tras eliminar usuarios
+        id = max(self._usuarios_por_id, default=0) + 1
         if len(password) < 6:
             print('    ')
             print("❌❌❌ La contraseña debe tener al menos 6 caracteres ❌❌❌")
@@ -87,10 +136,19 @@ class UsersService():
             print("❌❌❌ Email inválido ❌❌❌")
             print('    ')
             return None
+        email = email.strip()
+        if email in self._usuarios_por_email:
+            # Indexarlo sobrescribiría al usuario existente en el índice por
+            # email y la persistencia lo rechazaría por UNIQUE(email)
+            print('    ')
+            print("❌❌❌ Ya existe un usuario con ese email ❌❌❌")
+            print('    ')
+            return None
         
-        user = User(id, name.strip(), email.strip(), password.strip(), dt.today().date(), dt.today().date())
-        self.users.append(user)
-        self._guardar_usuarios()
+        hoy = dt.today().date()
+        user = User(id, name.strip(), email, password.strip(), hoy, hoy)
+        self._indexar_usuario(user)
+        self.persistencia.guardar_usuario(user)
         return user
 
     def get_all_users(self):
@@ -98,7 +156,7 @@ class UsersService():
         Obtiene todos los usuarios registrados en el sistema.
         
         Returns:
-            list[User]: Lista de todos los usuarios en el sistema.
+            tuple[User, ...]: Todos los usuarios del sistema, de solo lectura.
         """
         return self.users
     
@@ -113,18 +171,21 @@ class UsersService():
             User or None: El objeto usuario eliminado si fue encontrado, None si no existe.
         """
         print(f"Eliminando usuario {id}...")
-        for user in self.users:
-            if user.id == id:
-                self.users.remove(user)
-                self._guardar_usuarios()
-                return user
-        return None
+        user = self._usuarios_por_id.pop(id, None)
+        if user is None:
+            return None
+        
+        if self._usuarios_por_email.get(user.email) is user:
+            del self._usuarios_por_email[user.email]
+        self.persistencia.eliminar_usuario(id)
+        return user
     
     def login(self, email, password):
         """
         Autentica a un usuario con sus credenciales.
         
-        Busca un usuario que coincida con el email y contraseña proporcionados.
+        Busca el usuario por email en el índice y compara la contraseña
+        en tiempo constante.
         
         Args:
             email (str): Dirección de correo electrónico del usuario.
@@ -133,7 +194,7 @@ class UsersService():
         Returns:
             User or None: El objeto usuario si las credenciales son válidas, None en caso contrario.
         """
-        for user in self.users:
-            if user.email == email and user.password == password:
-                return user
+        user = self._usuarios_por_email.get(email)
+        if user and hmac.compare_digest(user.password.encode(), password.encode()):
+            return user
         return None
\ No newline at end of file
@@ -60,6 +60,7 @@ class TestNodoCategoria(unittest.TestCase):
         - La relación padre-hijo se establece correctamente
         - Los hijos se agregan a la lista de hijos del padre
         - El atributo padre se establece en el nodo hijo
+        - agregar_hijos agrega varios hijos de una vez
         """
         # Verificar que el nodo raíz se creó correctamente
         self.assertEqual(self.raiz.nombre, "Biblioteca")
@@ -88,6 +89,17 @@ class TestNodoCategoria(unittest.TestCase):
         
         ruta_historia = self.historia.obtener_ruta()
         self.assertEqual(ruta_historia, ["Biblioteca", "No Ficción", "Historia"])
+        
+        # Verificar que agregar_hijos agrega varios hijos en orden
+        biografia = NodoCategoria("Biografía", "Biografías")
+        ciencia = NodoCategoria("Ciencia", "Divulgación científica")
+        ciencia.agregar_libro(7)
+        self.assertEqual(self.raiz.contar_libros_totales(), 0)
+        self.no_ficcion.agregar_hijos([biografia, ciencia])
+        self.assertEqual(self.no_ficcion.hijos, [self.historia, biografia, ciencia])
+        self.assertEqual(ciencia.padre, self.no_ficcion)
+        self.assertEqual(ciencia.obtener_ruta(), ["Biblioteca", "No Ficción", "Ciencia"])
+        self.assertEqual(self.raiz.contar_libros_totales(), 1)
     
     def test_gestion_libros_en_nodo(self):
         """
@@ -157,6 +169,14 @@ class TestNodoCategoria(unittest.TestCase):
         
         # Verificar que el conteo total se actualizó después de remover
         self.assertEqual(self.ficcion.contar_libros_totales(), 5)  # 1 directo + 4 de subcategorías
+        
+        # Verificar que agregar una subcategoría con libros actualiza los totales
+        fantasia = NodoCategoria("Fantasía", "Fantasía")
+        fantasia.agregar_libro(20)
+        self.ficcion.agregar_hijo(fantasia)
+        self.assertEqual(self.ficcion.contar_libros_totales(), 6)
+        self.assertEqual(self.raiz.contar_libros_totales(), 6)
+        self.assertIn(20, self.raiz.obtener_todos_los_libros())
 
 
 if __name__ == '__main__':
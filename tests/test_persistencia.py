@@ -0,0 +1,597 @@
+"""
+Tests unitarios para el servicio de persistencia en SQLite.
+
+Este módulo contiene pruebas para verificar que el guardado y la carga
+de datos conservan la información y que las actualizaciones sucesivas
+solo modifican las filas que cambiaron.
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+# Agregar el directorio raíz al path para importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.persistencia_service import ServicioPersistencia
+from models.users import User
+from models.movements import Movement
+from models.books import Book
+from datetime import date
+
+
+class TestServicioPersistencia(unittest.TestCase):
+    """
+    Suite de tests para la clase ServicioPersistencia.
+
+    Prueba las funcionalidades principales de la persistencia:
+    - Guardado y carga de usuarios
+    - Sincronización de la tabla con la lista en memoria
+    - Asignaciones de categorías a libros
+    """
+
+    def setUp(self):
+        """
+        Configuración inicial para cada test.
+        Crea un servicio de persistencia sobre un directorio temporal.
+        """
+        self.directorio = tempfile.mkdtemp()
+        self.persistencia = ServicioPersistencia(self.directorio)
+        self.fecha = date(2024, 1, 15)
+        self.usuarios = [
+            User(1, "Ana", "ana@ejemplo.com", "secreto1", self.fecha, self.fecha),
+            User(2, "Luis", "luis@ejemplo.com", "secreto2", self.fecha, self.fecha),
+            User(3, "Eva", "eva@ejemplo.com", "secreto3", self.fecha, self.fecha),
+        ]
+
+    def tearDown(self):
+        """
+        Cierra la conexión y elimina el directorio temporal.
+        """
+        self.persistencia.cerrar()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_guardar_y_cargar_usuarios(self):
+        """
+        Test 1: Verifica que los usuarios guardados se cargan sin cambios.
+
+        Este test verifica que:
+        - Se guardan todos los usuarios
+        - Los campos de texto se conservan
+        - Las fechas se recuperan como objetos date
+        - La contraseña se guarda como BLOB y se recupera como texto
+        """
+        self.assertTrue(self.persistencia.guardar_usuarios(self.usuarios))
+
+        tipo = self.persistencia.conn.execute(
+            'SELECT typeof(password) FROM usuarios WHERE id = 1'
+        ).fetchone()[0]
+        self.assertEqual(tipo, 'blob')
+
+        datos = self.persistencia.cargar_usuarios()
+        self.assertEqual(len(datos), 3)
+
+        ana = next(d for d in datos if d['id'] == 1)
+        self.assertEqual(ana['name'], "Ana")
+        self.assertEqual(ana['email'], "ana@ejemplo.com")
+        self.assertEqual(ana['password'], "secreto1")
+        self.assertEqual(ana['created_at'], self.fecha)
+        self.assertEqual(ana['updated_at'], self.fecha)
+
+    def test_guardar_sincroniza_cambios(self):
+        """
+        Test 2: Verifica que guardar de nuevo sincroniza la tabla con la lista.
+
+        Este test verifica que:
+        - Guardar la misma lista no modifica ninguna fila
+        - Los usuarios modificados se actualizan
+        - Los usuarios que ya no están en la lista se eliminan
+        """
+        self.persistencia.guardar_usuarios(self.usuarios)
+
+        cambios_previos = self.persistencia.conn.total_changes
+        self.persistencia.guardar_usuarios(self.usuarios)
+        self.assertEqual(self.persistencia.conn.total_changes, cambios_previos)
+
+        self.usuarios[1].name = "Luis Pérez"
+        del self.usuarios[2]
+        self.assertTrue(self.persistencia.guardar_usuarios(self.usuarios))
+
+        datos = {d['id']: d for d in self.persistencia.cargar_usuarios()}
+        self.assertEqual(set(datos), {1, 2})
+        self.assertEqual(datos[2]['name'], "Luis Pérez")
+
+    def test_guardar_y_cargar_categorias_libros(self):
+        """
+        Test 3: Verifica el guardado de asignaciones de categorías.
+
+        Este test verifica que:
+        - Las asignaciones se cargan agrupadas por categoría como conjuntos
+        - Las asignaciones removidas desaparecen al guardar de nuevo
+        - Se pueden guardar conjuntos además de listas
+        """
+        self.persistencia.guardar_categorias_libros({"Novela": [1, 2], "Historia": [3]})
+
+        datos = self.persistencia.cargar_categorias_libros()
+        self.assertEqual(datos["Novela"], {1, 2})
+        self.assertIn(3, datos["Historia"])
+
+        self.persistencia.guardar_categorias_libros({"Novela": {2}})
+
+        datos = self.persistencia.cargar_categorias_libros()
+        self.assertEqual(datos, {"Novela": {2}})
+
+    def test_convertir_string_a_fecha(self):
+        """
+        Test 4: Verifica la conversión de texto ISO a fecha.
+
+        Este test verifica que:
+        - Las fechas y fechas con hora se convierten a date
+        - Los valores vacíos o inválidos devuelven None
+        """
+        convertir = self.persistencia._convertir_string_a_fecha
+        self.assertEqual(convertir("2024-01-15"), self.fecha)
+        self.assertEqual(convertir("2024-01-15T10:30:00"), self.fecha)
+        self.assertIsNone(convertir(None))
+        self.assertIsNone(convertir(""))
+        self.assertIsNone(convertir("15/01/2024"))
+
+    def test_fechas_de_movimientos_como_dias(self):
+        """
+        Test 5: Verifica que las fechas de movimientos se guardan como enteros.
+
+        Este test verifica que:
+        - Las fechas se almacenan como días desde 1970-01-01
+        - Las fechas se recuperan como objetos date
+        - Una fecha de devolución vacía se conserva como None
+        """
+        movimientos = [
+            Movement(1, 1, "Ana", "1234567890", self.fecha, None, False, self.fecha, self.fecha),
+            Movement(2, 1, "Luis", "0987654321", self.fecha, "2024-02-01", True, self.fecha, self.fecha),
+        ]
+        self.assertTrue(self.persistencia.guardar_movimientos(movimientos))
+
+        tipo, valor = self.persistencia.conn.execute(
+            'SELECT typeof(loan_date), loan_date FROM movimientos WHERE id = 1'
+        ).fetchone()
+        self.assertEqual(tipo, 'integer')
+        self.assertEqual(valor, (self.fecha - date(1970, 1, 1)).days)
+
+        datos = {d['id']: d for d in self.persistencia.cargar_movimientos()}
+        self.assertEqual(datos[1]['loan_date'], self.fecha)
+        self.assertIsNone(datos[1]['return_date'])
+        self.assertEqual(datos[2]['return_date'], date(2024, 2, 1))
+        self.assertTrue(datos[2]['returned'])
+
+    def test_migrar_fechas_de_texto(self):
+        """
+        Test 6: Verifica la conversión de bases con fechas de movimientos en texto.
+
+        Este test verifica que:
+        - Las columnas de fecha pasan a ser INTEGER
+        - Los movimientos existentes conservan sus fechas
+        - Las fechas con hora anteriores a 1970 conservan su día
+        """
+        self.persistencia.cerrar()
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, True)
+
+        conn = sqlite3.connect(os.path.join(directorio, "biblioteca.db"))
+        conn.execute('''
+            CREATE TABLE movimientos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                book_id INTEGER NOT NULL,
+                student_name TEXT NOT NULL,
+                student_identification TEXT NOT NULL,
+                loan_date DATE NOT NULL,
+                return_date DATE,
+                returned INTEGER NOT NULL DEFAULT 0,
+                created_at DATE NOT NULL,
+                updated_at DATE NOT NULL
+            )
+        ''')
+        conn.execute(
+            "INSERT INTO movimientos VALUES (1, 1, 'Ana', '1234567890', "
+            "'2024-01-15', NULL, 0, '2024-01-15', '2024-01-15')"
+        )
+        conn.execute(
+            "INSERT INTO movimientos VALUES (2, 1, 'Luis', '0987654321', "
+            "'1969-12-31 12:00:00', '1969-12-31', 1, '1969-12-31 12:00:00', '1969-12-31')"
+        )
+        conn.commit()
+        conn.close()
+
+        self.persistencia = ServicioPersistencia(directorio)
+        tipos = {
+            fila[1]: fila[2]
+            for fila in self.persistencia.conn.execute('PRAGMA table_info(movimientos)')
+        }
+        self.assertEqual(tipos['loan_date'], 'INTEGER')
+
+        movimiento = self.persistencia.cargar_movimientos()[0]
+        self.assertEqual(movimiento['loan_date'], self.fecha)
+        self.assertIsNone(movimiento['return_date'])
+
+        dias = self.persistencia.conn.execute(
+            'SELECT loan_date, return_date, created_at FROM movimientos WHERE id = 2'
+        ).fetchone()
+        self.assertEqual(tuple(dias), (-1, -1, -1))
+        movimiento = self.persistencia.cargar_movimientos()[1]
+        self.assertEqual(movimiento['loan_date'], date(1969, 12, 31))
+
+    def test_guardar_y_eliminar_usuario_individual(self):
+        """
+        Test 7: Verifica las operaciones sobre un solo usuario.
+
+        Este test verifica que:
+        - guardar_usuario inserta y actualiza sin tocar a los demás
+        - eliminar_usuario borra solo el usuario indicado
+        """
+        self.persistencia.guardar_usuarios(self.usuarios[:2])
+
+        self.assertTrue(self.persistencia.guardar_usuario(self.usuarios[2]))
+        self.usuarios[0].name = "Ana María"
+        self.assertTrue(self.persistencia.guardar_usuario(self.usuarios[0]))
+        self.assertTrue(self.persistencia.eliminar_usuario(2))
+
+        datos = {d['id']: d for d in self.persistencia.cargar_usuarios()}
+        self.assertEqual(set(datos), {1, 3})
+        self.assertEqual(datos[1]['name'], "Ana María")
+
+    def test_conexion_por_hilo(self):
+        """
+        Test 8: Verifica que cada hilo usa su propia conexión.
+
+        Este test verifica que:
+        - Otro hilo obtiene una conexión distinta a la del hilo principal
+        - Los datos guardados en un hilo se leen desde otro
+        """
+        self.persistencia.guardar_usuarios(self.usuarios)
+        resultado = {}
+
+        def cargar_en_hilo():
+            resultado['conn'] = self.persistencia.conn
+            resultado['usuarios'] = self.persistencia.cargar_usuarios()
+
+        hilo = threading.Thread(target=cargar_en_hilo)
+        hilo.start()
+        hilo.join()
+
+        self.assertIsNot(resultado['conn'], self.persistencia.conn)
+        self.assertEqual(len(resultado['usuarios']), 3)
+
+    def test_cache_de_cargas(self):
+        """
+        Test 9: Verifica la caché de los métodos cargar_*.
+
+        Este test verifica que:
+        - Modificar el resultado no altera las cargas siguientes
+        - Los cambios hechos por el servicio invalidan la caché
+        - Los cambios hechos desde otra conexión invalidan la caché
+        """
+        self.persistencia.guardar_usuarios(self.usuarios)
+
+        datos = self.persistencia.cargar_usuarios()
+        datos[0]['name'] = "Modificado"
+        datos.pop()
+        self.assertEqual(len(self.persistencia.cargar_usuarios()), 3)
+        self.assertNotEqual(self.persistencia.cargar_usuarios()[0]['name'], "Modificado")
+
+        self.persistencia.eliminar_usuario(3)
+        self.assertEqual(len(self.persistencia.cargar_usuarios()), 2)
+
+        otra = sqlite3.connect(self.persistencia.db_path)
+        otra.execute('DELETE FROM usuarios WHERE id = 2')
+        otra.commit()
+        otra.close()
+        self.assertEqual(len(self.persistencia.cargar_usuarios()), 1)
+
+    def test_guardar_libro_y_movimiento_individual(self):
+        """
+        Test 10: Verifica las operaciones sobre un solo libro o movimiento.
+
+        Este test verifica que:
+        - guardar_libro y eliminar_libro modifican solo el libro indicado
+        - guardar_movimiento inserta y luego actualiza una devolución
+        """
+        libros = [
+            Book(1, "Libro A", "Autor", "2000", "1234567890", 2, self.fecha, self.fecha),
+            Book(2, "Libro B", "Autor", "2001", "0987654321", 1, self.fecha, self.fecha),
+        ]
+        self.persistencia.guardar_libros(libros)
+        libros[0].quantity = 1
+        self.assertTrue(self.persistencia.guardar_libro(libros[0]))
+        self.assertTrue(self.persistencia.eliminar_libro(2))
+
+        datos = self.persistencia.cargar_libros()
+        self.assertEqual([(d['id'], d['quantity']) for d in datos], [(1, 1)])
+
+        movimiento = Movement(1, 1, "Ana", "1234567890", self.fecha, None, False, self.fecha, self.fecha)
+        self.assertTrue(self.persistencia.guardar_movimiento(movimiento))
+        movimiento.returned = True
+        movimiento.return_date = date(2024, 1, 20)
+        self.assertTrue(self.persistencia.guardar_movimiento(movimiento))
+
+        datos = self.persistencia.cargar_movimientos()
+        self.assertEqual(len(datos), 1)
+        self.assertTrue(datos[0]['returned'])
+        self.assertEqual(datos[0]['return_date'], date(2024, 1, 20))
+
+    def test_transaccion(self):
+        """
+        Test 11: Verifica que transaccion agrupa varios guardados.
+
+        Este test verifica que:
+        - Los guardados del bloque se confirman juntos al salir
+        - Una excepción en el bloque deshace todos los guardados
+        - Los guardados por lotes funcionan dentro del bloque
+        """
+        with self.persistencia.transaccion():
+            self.persistencia.guardar_usuarios(self.usuarios[:2])
+            self.persistencia.guardar_usuario(self.usuarios[2])
+            self.assertTrue(self.persistencia.conn.in_transaction)
+        self.assertFalse(self.persistencia.conn.in_transaction)
+        self.assertEqual(len(self.persistencia.cargar_usuarios()), 3)
+
+        with self.assertRaises(RuntimeError):
+            with self.persistencia.transaccion():
+                self.persistencia.eliminar_usuario(1)
+                self.assertTrue(self.persistencia.guardar_usuarios(self.usuarios[:1]))
+                raise RuntimeError("fallo")
+
+        datos = {d['id'] for d in self.persistencia.cargar_usuarios()}
+        self.assertEqual(datos, {1, 2, 3})
+
+    def test_indice(self):
+        """
+        Test 12: Verifica el índice de registros por campo.
+
+        Este test verifica que:
+        - Los registros se indexan por el valor del campo indicado
+        - Los cambios en la tabla se reflejan en el índice
+        - Una colección desconocida lanza ValueError
+        """
+        self.persistencia.guardar_usuarios(self.usuarios)
+
+        indice = self.persistencia.indice('usuarios', 'email')
+        self.assertIn("luis@ejemplo.com", indice)
+        self.assertEqual(indice["luis@ejemplo.com"]['id'], 2)
+
+        indice["luis@ejemplo.com"]['name'] = "Modificado"
+        self.assertEqual(self.persistencia.indice('usuarios', 'email')["luis@ejemplo.com"]['name'], "Luis")
+
+        self.persistencia.eliminar_usuario(2)
+        self.assertNotIn("luis@ejemplo.com", self.persistencia.indice('usuarios', 'email'))
+
+        with self.assertRaises(ValueError):
+            self.persistencia.indice('categorias', 'nombre')
+
+    def test_cache_tras_rollback(self):
+        """
+        Test 13: Verifica que deshacer una escritura invalida la caché de cargas.
+
+        Este test verifica que:
+        - Una carga hecha dentro de una transacción deshecha no se reutiliza
+        - Un guardado por lotes fallido no deja cargas con filas deshechas
+        """
+        self.persistencia.guardar_usuario(self.usuarios[0])
+
+        with self.assertRaises(RuntimeError):
+            with self.persistencia.transaccion():
+                self.persistencia.guardar_usuario(self.usuarios[1])
+                self.assertEqual(len(self.persistencia.cargar_usuarios()), 2)
+                raise RuntimeError("fallo")
+
+        self.assertEqual([d['id'] for d in self.persistencia.cargar_usuarios()], [1])
+
+        # Dos usuarios con el mismo email violan UNIQUE(email)
+        repetido = User(4, "Otro", "ana@ejemplo.com", "secreto4", self.fecha, self.fecha)
+        with self.persistencia.transaccion():
+            self.persistencia.guardar_usuario(self.usuarios[2])
+            self.assertEqual(len(self.persistencia.cargar_usuarios()), 2)
+            self.assertFalse(self.persistencia.guardar_usuarios([self.usuarios[0], repetido]))
+            ids = [d['id'] for d in self.persistencia.cargar_usuarios()]
+            self.assertEqual(ids, [1, 3])
+
+    def test_guardado_por_lotes_con_excepcion(self):
+        """
+        Test 14: Verifica que un error ajeno a SQLite no deja el guardado abierto.
+
+        Este test verifica que:
+        - La excepción se propaga al llamador
+        - El SAVEPOINT se deshace y la conexión vuelve a modo autocommit
+        - Las escrituras siguientes se confirman y las ven otras conexiones
+        """
+        self.persistencia.guardar_usuarios(self.usuarios)
+
+        # Una contraseña None falla al convertirse a BLOB con AttributeError
+        invalido = User(1, "Ana", "ana@ejemplo.com", None, self.fecha, self.fecha)
+        with self.assertRaises(AttributeError):
+            self.persistencia.guardar_usuarios([invalido])
+
+        self.assertFalse(self.persistencia.conn.in_transaction)
+        self.assertEqual(len(self.persistencia.cargar_usuarios()), 3)
+
+        self.persistencia.eliminar_usuario(3)
+        otra = sqlite3.connect(self.persistencia.db_path)
+        total = otra.execute('SELECT COUNT(*) FROM usuarios').fetchone()[0]
+        otra.close()
+        self.assertEqual(total, 2)
+
+    def _poblar_para_respaldo(self):
+        """
+        Guarda usuarios, libros, movimientos y categorías para exportarlos.
+        """
+        self.persistencia.guardar_usuarios(self.usuarios)
+        self.persistencia.guardar_libros([
+            Book(1, "Libro A", "Autor", "2000", "1234567890", 2, self.fecha, self.fecha),
+            Book(2, "Libro B", "Autor", "2001", "0987654321", 1, self.fecha, self.fecha),
+        ])
+        self.persistencia.guardar_movimientos([
+            Movement(1, 1, "Ana", "1234567890", self.fecha, date(2024, 1, 20), True, self.fecha, self.fecha),
+            Movement(2, 2, "Luis", "0987654321", self.fecha, None, False, self.fecha, self.fecha),
+        ])
+        self.persistencia.guardar_categorias_libros({"Novela": {2, 1}, "Historia": {2}})
+
+    def _leer_respaldo(self, nombre_archivo, abrir=open):
+        """
+        Lee un respaldo exportado sin la fecha de exportación, que varía entre llamadas.
+        """
+        with abrir(os.path.join(self.directorio, nombre_archivo), 'rt', encoding='utf-8') as archivo:
+            texto = archivo.read()
+        datos = json.loads(texto)
+        self.assertIn("fecha_exportacion", datos)
+        del datos["fecha_exportacion"]
+        return texto, datos
+
+    def test_exportar_formatos(self):
+        """
+        Test 15: Verifica que el respaldo compacto y el legible contienen los mismos datos.
+
+        Este test verifica que:
+        - Ambos formatos se interpretan como el mismo JSON
+        - Las fechas se exportan como texto ISO
+        - returned se exporta como booleano
+        - Las categorías se exportan como listas ordenadas de IDs
+        """
+        self._poblar_para_respaldo()
+        self.assertTrue(self.persistencia.exportar_todo("compacto.json"))
+        self.assertTrue(self.persistencia.exportar_todo("legible.json", formato_legible=True))
+
+        texto_compacto, compacto = self._leer_respaldo("compacto.json")
+        texto_legible, legible = self._leer_respaldo("legible.json")
+        self.assertEqual(compacto, legible)
+        self.assertNotIn("\n", texto_compacto)
+        self.assertIn('\n  "usuarios": [\n    {', texto_legible)
+
+        self.assertEqual(compacto["usuarios"][0]["created_at"], "2024-01-15")
+        self.assertEqual(compacto["usuarios"][0]["password"], "secreto1")
+        self.assertEqual(
+            [(m["id"], m["returned"], m["return_date"]) for m in compacto["movimientos"]],
+            [(1, True, "2024-01-20"), (2, False, None)]
+        )
+        self.assertEqual(compacto["movimientos"][0]["loan_date"], "2024-01-15")
+        self.assertEqual([l["id"] for l in compacto["libros"]], [1, 2])
+        self.assertEqual(compacto["categorias_libros"], {"Novela": [1, 2], "Historia": [2]})
+
+    def test_exportar_comprimido(self):
+        """
+        Test 16: Verifica el respaldo comprimido con gzip.
+
+        Este test verifica que:
+        - Se agrega la extensión .gz al nombre del archivo
+        - El contenido descomprimido es el mismo que el del respaldo sin comprimir
+        """
+        self._poblar_para_respaldo()
+        self.assertTrue(self.persistencia.exportar_todo("respaldo.json"))
+        self.assertTrue(self.persistencia.exportar_todo("respaldo.json", comprimir=True))
+
+        _, plano = self._leer_respaldo("respaldo.json")
+        _, comprimido = self._leer_respaldo("respaldo.json.gz", abrir=gzip.open)
+        self.assertEqual(comprimido, plano)
+
+    def test_escritura_atomica_fallida(self):
+        """
+        Test 17: Verifica que una escritura fallida no deja archivos a medias.
+
+        Este test verifica que:
+        - La excepción se propaga al llamador
+        - No queda el archivo temporal en el directorio
+        - El archivo destino anterior se conserva intacto
+        """
+        ruta = os.path.join(self.directorio, "respaldo.json")
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write("previo")
+
+        def fragmentos():
+            yield '{"usuarios":['
+            raise ValueError("fallo al generar el respaldo")
+
+        with self.assertRaises(ValueError):
+            self.persistencia._escribir_archivo_atomico(ruta, fragmentos())
+
+        self.assertEqual([n for n in os.listdir(self.directorio) if n.endswith('.tmp')], [])
+        with open(ruta, encoding='utf-8') as archivo:
+            self.assertEqual(archivo.read(), "previo")
+
+    def test_guardar_usuarios_intercambiando_emails(self):
+        """
+        Test 18: Verifica que dos usuarios pueden intercambiar su email en un guardado.
+
+        Este test verifica que:
+        - El guardado no falla por la restricción UNIQUE(email)
+        - Cada usuario conserva su id y queda con el email del otro
+        - Un email repetido dentro de la lista sigue rechazándose
+        """
+        self.persistencia.guardar_usuarios(self.usuarios)
+
+        self.usuarios[0].email, self.usuarios[1].email = self.usuarios[1].email, self.usuarios[0].email
+        self.assertTrue(self.persistencia.guardar_usuarios(self.usuarios))
+
+        datos = {d['id']: d['email'] for d in self.persistencia.cargar_usuarios()}
+        self.assertEqual(datos, {1: "luis@ejemplo.com", 2: "ana@ejemplo.com", 3: "eva@ejemplo.com"})
+
+        self.usuarios[2].email = "ana@ejemplo.com"
+        self.assertFalse(self.persistencia.guardar_usuarios(self.usuarios))
+        datos = {d['id']: d['email'] for d in self.persistencia.cargar_usuarios()}
+        self.assertEqual(datos[3], "eva@ejemplo.com")
+
+    def test_fechas_de_movimientos_no_validas(self):
+        """
+        Test 19: Verifica que las fechas de movimientos que no son ISO se rechazan.
+
+        Este test verifica que:
+        - guardar_movimiento lanza ValueError y no escribe la fila
+        - La migración deja sin convertir una tabla con fechas no válidas
+        """
+        movimiento = Movement(1, 1, "Ana", "1234567890", self.fecha, "el viernes", False, self.fecha, self.fecha)
+        with self.assertRaises(ValueError):
+            self.persistencia.guardar_movimiento(movimiento)
+        self.assertEqual(self.persistencia.cargar_movimientos(), [])
+
+        self.persistencia.cerrar()
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, True)
+
+        conn = sqlite3.connect(os.path.join(directorio, "biblioteca.db"))
+        conn.execute('''
+            CREATE TABLE movimientos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                book_id INTEGER NOT NULL,
+                student_name TEXT NOT NULL,
+                student_identification TEXT NOT NULL,
+                loan_date DATE NOT NULL,
+                return_date DATE,
+                returned INTEGER NOT NULL DEFAULT 0,
+                created_at DATE NOT NULL,
+                updated_at DATE NOT NULL
+            )
+        ''')
+        conn.execute(
+            "INSERT INTO movimientos VALUES (1, 1, 'Ana', '1234567890', "
+            "'2024-01-15', 'el viernes', 0, '2024-01-15', '2024-01-15')"
+        )
+        conn.commit()
+        conn.close()
+
+        with self.assertLogs('services.persistencia_service', 'ERROR'):
+            self.persistencia = ServicioPersistencia(directorio)
+        tipos = {
+            fila[1]: fila[2]
+            for fila in self.persistencia.conn.execute('PRAGMA table_info(movimientos)')
+        }
+        self.assertEqual(tipos['loan_date'], 'DATE')
+
+        movimiento = self.persistencia.cargar_movimientos()[0]
+        self.assertEqual(movimiento['loan_date'], self.fecha)
+        self.assertIsNone(movimiento['return_date'])
+
+
+if __name__ == '__main__':
+    unittest.main()